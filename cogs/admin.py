@@ -8,8 +8,13 @@ import time
 from utils.variables import START_TIME
 from utils.setup_logger import log_slash_command
 import psutil
+import pandas as pd
 import platform
 from utils.permissions import has_allowed_role_and_channel
+from utils.async_db import run_db
+from utils.database import load_job_runs
+from utils.scheduler import STATUS_SKIPPED
+from utils.chart_renderer import renderer_metrics
 
 
 GUILD_ID = int(os.getenv("GUILD_ID"))
@@ -43,11 +48,36 @@ class ConfirmView(ui.View):
 class Admin(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.job_tasks = set()
 
     
     admin_group = app_commands.Group(name="admin", description="Admin commands")
 
 
+    # Jobs can run for hours, well past the 15 minutes an interaction token lasts, so the command
+    # replies straight away and the result is posted to the channel once the job finishes
+    async def start_job(self, interaction: discord.Interaction, scheduler, job, trigger, started_message, **kwargs):
+        if scheduler.is_running(job):
+            await interaction.response.send_message(f"`{job}` is already running, try again once it finishes.")
+            return
+
+        await interaction.response.send_message(f"{started_message} See `/admin job-history` for progress.")
+
+        async def report():
+            status = await scheduler.run(job, trigger=trigger, **kwargs)
+            try:
+                if status == STATUS_SKIPPED:
+                    await interaction.channel.send(f"`{job}` was already running, so this run was skipped.")
+                else:
+                    await interaction.channel.send(f"`{job}` finished ({status}). See `/admin job-history` for details.")
+            except discord.HTTPException as e:
+                logger.warning(f"Failed to report result of {job}: {e}", extra={"category": ["admin", "start_job"]})
+
+        task = self.bot.loop.create_task(report())
+        self.job_tasks.add(task)
+        task.add_done_callback(self.job_tasks.discard)
+
+
     @admin_group.command(name="shutdown", description="Gracefully shuts down PE Helper.")
     @has_allowed_role_and_channel(allowed_roles=['Admin'], allowed_channels=['⚙️┃admin-related'])
     async def shutdown(self, interaction: discord.Interaction):
@@ -104,6 +134,113 @@ class Admin(commands.Cog):
             await interaction.response.send_message(f"Reload failed: {e}", ephemeral=True)
     
 
+    @admin_group.command(name="rebuild-message-stats", description="Rescans all channel histories to rebuild message stats.")
+    @has_allowed_role_and_channel(allowed_roles=['Admin'], allowed_channels=['⚙️┃admin-related'])
+    async def rebuild_message_stats(self, interaction: discord.Interaction):
+
+        log_slash_command(logger, interaction)
+
+        background_tasks = self.bot.get_cog("BackgroundTasks")
+        if background_tasks is None:
+            await interaction.response.send_message("Background tasks are not loaded.", ephemeral=True)
+            return
+
+        # A full-history rebuild can take hours, so the result is posted when it finishes
+        logger.info("Rebuilding message stats from full channel history.", extra={"category": ["admin", "rebuild_message_stats"]})
+        await self.start_job(
+            interaction, background_tasks.scheduler, "count_messages",
+            trigger=f"rebuild by {interaction.user.display_name}",
+            started_message="Rebuilding message stats from full channel history.",
+            rebuild=True
+        )
+
+
+    @admin_group.command(name="rescan-links", description="Rescans the whole weekly-sessions channel for SignUpGenius links.")
+    @has_allowed_role_and_channel(allowed_roles=['Admin'], allowed_channels=['⚙️┃admin-related'])
+    async def rescan_links(self, interaction: discord.Interaction):
+
+        log_slash_command(logger, interaction)
+
+        background_tasks = self.bot.get_cog("BackgroundTasks")
+        if background_tasks is None:
+            await interaction.response.send_message("Background tasks are not loaded.", ephemeral=True)
+            return
+
+        # Runs as collect_and_scrape so it never overlaps a scheduled scrape writing the same links
+        logger.info("Rescanning weekly-sessions channel for links.", extra={"category": ["admin", "rescan_links"]})
+        await self.start_job(
+            interaction, background_tasks.scheduler, "collect_and_scrape",
+            trigger=f"rescan by {interaction.user.display_name}",
+            started_message="Rescanning weekly-sessions links.",
+            full_rescan=True
+        )
+
+
+    async def job_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        background_tasks = self.bot.get_cog("BackgroundTasks")
+        names = list(background_tasks.scheduler.jobs) if background_tasks else []
+        return [app_commands.Choice(name=n, value=n) for n in names if current.lower() in n.lower()][:25]
+
+
+    @admin_group.command(name="run-job", description="Runs a background job now.")
+    @has_allowed_role_and_channel(allowed_roles=['Admin'], allowed_channels=['⚙️┃admin-related'])
+    @app_commands.describe(job="Name of the background job to run.")
+    @app_commands.autocomplete(job=job_autocomplete)
+    async def run_job(self, interaction: discord.Interaction, job: str):
+
+        log_slash_command(logger, interaction)
+
+        background_tasks = self.bot.get_cog("BackgroundTasks")
+        if background_tasks is None:
+            await interaction.response.send_message("Background tasks are not loaded.", ephemeral=True)
+            return
+        if job not in background_tasks.scheduler.jobs:
+            await interaction.response.send_message(f"Unknown job `{job}`.", ephemeral=True)
+            return
+
+        await self.start_job(
+            interaction, background_tasks.scheduler, job,
+            trigger=f"manual by {interaction.user.display_name}",
+            started_message=f"Started `{job}`."
+        )
+
+
+    @admin_group.command(name="job-history", description="Shows recent background job runs.")
+    @has_allowed_role_and_channel(allowed_roles=['Admin'], allowed_channels=['⚙️┃admin-related'])
+    @app_commands.describe(job="Only show runs of this job.", limit="Number of runs to show (max 25).")
+    @app_commands.autocomplete(job=job_autocomplete)
+    async def job_history(self, interaction: discord.Interaction, job: str = None, limit: app_commands.Range[int, 1, 25] = 10):
+
+        log_slash_command(logger, interaction)
+
+        df = await run_db(load_job_runs, job, limit)
+        if df.empty:
+            await interaction.response.send_message("No job runs recorded yet.")
+            return
+
+        lines = []
+        for row in df.itertuples(index=False):
+            duration = f"{row.duration_s:.1f}s" if pd.notna(row.duration_s) else "-"
+            rows = int(row.rows) if pd.notna(row.rows) else "-"
+            line = f"{row.started_at[:16]} {row.job} [{row.status}] {duration}, {rows} rows ({row.trigger})"
+            if pd.notna(row.error):
+                line += f"\n    {row.error[:150]}"
+            lines.append(line)
+
+        embed = discord.Embed(title="Job History", description="```" + "\n".join(lines)[:4000] + "```")
+
+        background_tasks = self.bot.get_cog("BackgroundTasks")
+        if background_tasks is not None:
+            scheduler = background_tasks.scheduler
+            running = [name for name in scheduler.jobs if scheduler.is_running(name)]
+            upcoming = {name: when for name, when in scheduler.next_runs().items() if when is not None}
+            embed.add_field(name="Running", value=", ".join(running) or "None", inline=False)
+            if upcoming:
+                embed.add_field(name="Next runs", value="\n".join(f"{name}: {when:%Y-%m-%d %H:%M}" for name, when in upcoming.items()), inline=False)
+
+        await interaction.response.send_message(embed=embed)
+
+
     @admin_group.command(name="info", description="Bot stats like uptime, memory, CPU.")
     @has_allowed_role_and_channel(allowed_roles=['Admin'], allowed_channels=['⚙️┃admin-related'])
     async def info(self, interaction: discord.Interaction):
@@ -116,11 +253,21 @@ class Admin(commands.Cog):
 
         embed = discord.Embed(title="Bot Info")
         embed.add_field(name="Uptime", value=f"{int(uptime // 60)} min", inline=True)
+        time_to_ready = getattr(self.bot, "time_to_ready", None)
+        embed.add_field(name="Time to Ready", value=f"{time_to_ready:.1f} s" if time_to_ready is not None else "Starting", inline=True)
         embed.add_field(name="Memory", value=f"{mem:.2f} MB", inline=True)
         embed.add_field(name="CPU", value=f"{cpu}%", inline=True)
         embed.add_field(name="Python", value=platform.python_version(), inline=True)
         embed.add_field(name="discord.py", value=discord.__version__, inline=True)
 
+        charts = renderer_metrics()
+        avg = f"{charts['avg_seconds']:.2f}s avg" if charts["avg_seconds"] is not None else "no renders yet"
+        embed.add_field(
+            name="Chart Renderer",
+            value=f"{charts['backend']}, {charts['workers']} workers, {charts['queue_depth']} queued\n{charts['rendered']} rendered ({avg}), {charts['failed']} failed, {charts['timeouts']} timed out",
+            inline=False
+        )
+
         await interaction.response.send_message(embed=embed)
 
 
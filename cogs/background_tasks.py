@@ -2,16 +2,13 @@ import discord
 from discord.ext import commands, tasks
 from utils.variables import SGT, last_update
 import pandas as pd
-from datetime import datetime, timezone
-from datetime import timedelta
+from datetime import datetime
 import re
 import os
-import csv
+import copy
 import asyncio
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import logging
@@ -19,150 +16,127 @@ import functools
 import time
 import utils.audio_essentials as audio_essentials
 from utils.channel_last_message_id_tracker import *
+from utils.channel_fetcher import fetch_channels
+from utils.driver_pool import DriverPool
+from utils.signupgenius import SCRAPE_EXTRACTION_MODE, clean_time_slot, extract_bookings, extract_header, parse_session_date
+from utils.signupgenius_fixtures import SIGNUPGENIUS_RECORD_DIR, record_page
+from utils.database import insert_links, load_booking_rollups, load_link_urls, load_links, replace_summary_numbers, save_links, save_piano_groups
+from utils.async_db import run_db
+from utils.scheduler import Scheduler
+from utils.roster_index import get_roster
+from utils.bookings_store import BookingsStore, get_academic_year
+from utils.charts import build_message_count, build_piano_groups, build_weekly_session_popularity, build_word_count
+from utils.chart_cache import chart_png
+from utils.snapshot import publish_snapshot, read_manifest
+from utils.link_lifecycle import STATE_NEW, STATE_PASSED, STATE_UNSCRAPABLE, STATE_UPCOMING, ensure_lifecycle_columns, finalize_passed_links, links_due
+from utils.message_archive import ARCHIVE_DIR, MessageBatchWriter, compact_archive, mark_archive_updated, is_archived_channel, message_to_row, migrate_legacy_archive
+from utils.message_stats_tracker import advance_cursor, clear_live_ranges, counted_live, export_top_csvs, is_counted_channel, load_message_stats, record_message, reset_message_stats, save_message_stats
+from cogs.message_capture import ARCHIVE_STORE, STATS_STORE
 import cogs.music_bot as music_bot
 from utils.variables import currently_playing, audio
 import traceback
 
 
 GUILD_ID = int(os.getenv("GUILD_ID"))
-NEW_MESSAGES_PARQUET = "../data/new_messages.parquet"
 ALL_MESSAGES_PARQUET = "../data/all_messages.parquet"
 
+# Daily crawl & scrape cadence (SGT); see utils/scheduler.py for the cron format
+DAILY_JOBS_CRON = os.getenv("DAILY_JOBS_CRON", "0 17 * * *")
+
 # Get logger
 logger = logging.getLogger("pe_helper")
 
 
+# Writes count_messages' results: the stats, the top 10 CSVs and the scanned channel list
+def save_count_results(stats, scanned):
+    save_message_stats(stats)
+    df_msg, df_words = export_top_csvs(stats)
+    with open("../data/channels.txt", "w", encoding="utf-8") as f:
+        f.write("\n".join(scanned))
+    return df_msg, df_words
+
+
 class BackgroundTasks(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.collect_links_task = None
+        self.started = False
+
+        self.scheduler = Scheduler()
+        self.scheduler.add_job("collect_and_scrape", self.collect_and_scrape, cron=DAILY_JOBS_CRON)
+        self.scheduler.add_job("count_messages", self.count_messages, cron=DAILY_JOBS_CRON)
+        self.scheduler.add_job("collect_new_messages", self.collect_new_messages, cron=DAILY_JOBS_CRON)
+        self.scheduler.add_job("compact_message_archive", self.compact_message_archive, cron=DAILY_JOBS_CRON, depends_on=["collect_new_messages"])
+        self.scheduler.add_job("count_piano_groups", self.count_piano_groups, cron=DAILY_JOBS_CRON)
+        self.scheduler.add_job("get_summary_numbers", self.get_summary_numbers, cron=DAILY_JOBS_CRON)
+        self.scheduler.add_job(
+            "publish_snapshot", self.publish_snapshot, cron=DAILY_JOBS_CRON,
+            depends_on=["collect_and_scrape", "count_piano_groups", "get_summary_numbers"]
+        )
 
 
     @commands.Cog.listener()
     async def on_ready(self):
-        logger.info("Starting background tasks.")
-        logger.info("Running count_messages once on startup.", extra={"category": "on_ready"})
-        await self.count_messages()
-        
-        if self.collect_links_task is None:
-            logger.info("Starting collect_links_time loop.", extra={"category": "on_ready"})
-            self.collect_links_task = self.bot.loop.create_task(self.collect_links_time())
-        else:
-            logger.info("collect_links_time loop already running.", extra={"category": "on_ready"})
+        if self.started:
+            logger.info("Scheduler already running.", extra={"category": "on_ready"})
+            return
+        self.started = True
 
+        # Persisted aggregates (message stats, bookings, summaries) are served as-is; only jobs
+        # whose scheduled run was missed while the bot was down are caught up, in the background
+        logger.info("Starting background tasks.")
+        self.scheduler.start()
+        self.bot.loop.create_task(self.catch_up())
 
-    async def collect_links_time(self):
-        try:
-            logger.info("Starting initial collect_and_scrape on startup.")
-            await self.collect_and_scrape()
-        except Exception:
-            logger.error("Error during collect_and_scrape", exc_info=True, extra={"category": ["background_tasks", "collect_and_scrape"]})
 
-        try:
-            logger.info("Starting initial count_messages on startup.")
-            await self.count_messages()
-        except Exception:
-            logger.error("Error during count_messages", exc_info=True, extra={"category": ["background_tasks", "count_messages"]})
+    async def catch_up(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, load_message_stats)  # Warm the stats cache before the first command
 
-        try:
-            logger.info("Starting initial collect_new_messages on startup.")
-            await self.collect_new_messages()
-        except Exception:
-            logger.error("Error during collect_new_messages", exc_info=True, extra={"category": ["background_tasks", "collect_new_messages"]})
+        # The dashboard has nothing to show until a snapshot exists (e.g. after a deploy or migration)
+        if await loop.run_in_executor(None, read_manifest) is None:
+            logger.info("No dashboard snapshot found, publishing one now.", extra={"category": ["background_tasks", "catch_up"]})
+            await self.scheduler.run("publish_snapshot", trigger="startup")
 
-        try:
-            logger.info("Starting initial count_piano_groups on startup.")
-            await self.count_piano_groups()
-        except Exception:
-            logger.error("Error during count_piano_groups", exc_info=True, extra={"category": ["background_tasks", "count_piano_groups"]})
+        missed = await self.scheduler.missed_jobs()
+        if missed:
+            logger.info(f"Catching up on missed jobs: {', '.join(missed)}", extra={"category": ["background_tasks", "catch_up"]})
+            await self.scheduler.run_group(missed, trigger="catch-up")
+        else:
+            logger.info("No missed jobs to catch up on.", extra={"category": ["background_tasks", "catch_up"]})
 
-        try:
-            logger.info("Starting initial get_summary_numbers on startup.")
-            await self.get_summary_numbers()
-        except Exception:
-            logger.error("Error during get_summary_numbers", exc_info=True, extra={"category": ["background_tasks", "get_summary_numbers"]})
 
-        while True:
-            now = datetime.now(SGT).astimezone()
+    def cog_unload(self):
+        self.scheduler.stop()
 
-            # Set target to today at 5 PM
-            target_time = now.replace(hour=17, minute=0, second=0, microsecond=0)
 
+    # Renders a chart into the chart cache as soon as its data changes, so /stats only uploads it
+    async def prerender_chart(self, name, data, build):
+        try:
+            await chart_png(name, data, build)
+        except Exception as e:
+            logger.warning(f"Failed to pre-render chart {name}: {e}", extra={"category": ["background_tasks", "prerender_chart"]})
 
-            # If it's already past 5 PM, schedule for 5 PM tomorrow
-            if now >= target_time:
-                target_time += timedelta(days=1)
 
-            wait_seconds = (target_time - now).total_seconds()
-            logger.info(f"collect_links_time sleeping for {wait_seconds:.2f} seconds until next 5 PM SGT.", extra={"category": ["background_tasks", "collect_links_time"]})
-            await asyncio.sleep(wait_seconds)
-            try:
-                await self.collect_and_scrape()
-                await self.count_messages()
-                await self.collect_new_messages()
-            except Exception as e:
-                logger.error(f"Error during scheduled collect_and_scrape: %s\n%s", e, traceback.format_exc(), extra={"category": ["background_tasks", "collect_and_scrape"]})
+    # Publishes the dashboard's data as one consistent versioned snapshot after the daily refresh
+    async def publish_snapshot(self):
+        return await run_db(publish_snapshot)
 
 
     async def count_piano_groups(self):
         logger.info("Starting count_piano_groups task.")
 
-        guild = self.bot.get_guild(GUILD_ID)
-
-        count_dict = {"Advanced": 0, "Intermediate": 0, "Novice": 0, "Foundational": 0}
-
-        for m in guild.members:
-            if m.bot:
-                continue
-            roles = {r.name for r in m.roles}
-            if "Member" in roles:  # Obtain current members only
-                if "Advanced" in roles:
-                    count_dict["Advanced"] += 1
-                elif "Intermediate" in roles:
-                    count_dict["Intermediate"] += 1
-                elif "Novice" in roles:
-                    count_dict["Novice"] += 1
-                elif "Foundational" in roles:
-                    count_dict["Foundational"] += 1
+        count_dict = get_roster(self.bot.get_guild(GUILD_ID)).piano_group_counts()
 
         logger.info(f"Counting of members in piano groups was successful.", extra={"category": ["background_tasks", "count_piano_groups"]})
-        df_piano_groups = pd.DataFrame([count_dict])
-        df_piano_groups.to_csv("../data/piano_groups.csv", index=False)
+        await run_db(save_piano_groups, count_dict)
+        await self.prerender_chart("piano_groups", count_dict, build_piano_groups)
+        return sum(count_dict.values())
     
 
     async def get_summary_numbers(self):
         logger.info("Starting get_summary_numbers task.")
         
-        guild = self.bot.get_guild(GUILD_ID)
-        summary_dict = {}
-        for m in guild.members:
-            if m.bot:
-                continue
-
-            roles = {r.name for r in m.roles}
-            join_date = m.joined_at
-
-            # Determine AY: April 1st to March 31st
-            if join_date.month >= 4:
-                ay_year = join_date.year
-            else:
-                ay_year = join_date.year - 1
-            ay_key = f"{ay_year}"
-
-            if ay_key not in summary_dict:
-                summary_dict[ay_key] = {"members_num": 0, "alumni_num": 0, "new_members_num": 0}
-
-            # Role counts
-            if "Member" in roles:
-                summary_dict[ay_key]["members_num"] += 1
-            elif "Alumni" in roles:
-                summary_dict[ay_key]["alumni_num"] += 1
-
-            # New member check: if joined during AY
-            ay_start = datetime(ay_year, 4, 1, tzinfo=timezone.utc)
-            ay_end = datetime(ay_year + 1, 4, 1, tzinfo=timezone.utc)
-            if ay_start <= join_date < ay_end:
-                summary_dict[ay_key]["new_members_num"] += 1
+        summary_dict = get_roster(self.bot.get_guild(GUILD_ID)).summary_numbers()
 
         summary_numbers = [
             {"AY": ay, **counts} for ay, counts in summary_dict.items()
@@ -170,55 +144,89 @@ class BackgroundTasks(commands.Cog):
 
         df = pd.DataFrame(summary_numbers)
         df = df.sort_values("AY")
-        df.to_csv("../data/summary_numbers.csv", index=False)
+        await run_db(replace_summary_numbers, df)
+        return len(df)
 
 
-    async def count_messages(self):
-        logger.info("Starting count_messages task.")
+    # Counts only messages posted after each channel's stored cursor.
+    # rebuild=True discards the stored counters and rescans every channel's full history.
+    async def count_messages(self, rebuild: bool = False):
+        logger.info(f"Starting count_messages task (rebuild={rebuild}).")
 
         guild = self.bot.get_guild(GUILD_ID)
-        message_counts: dict[str, int] = {}
-        word_counts: dict[str, int] = {}
-        target_roles = ['Member', 'Alumni']
-        role_objs = [discord.utils.get(guild.roles, name=r) for r in target_roles]
-
-        scanned = []
-        for ch in guild.text_channels:
-            if not any(ch.permissions_for(role).view_channel for role in role_objs if role):
-                continue
+        capture = self.bot.get_cog("MessageCapture")
+        loop = asyncio.get_running_loop()
+        stats = await loop.run_in_executor(None, load_message_stats)  # Reads the file only on first use
+        if rebuild:
+            stats = reset_message_stats()
+            if capture:
+                capture.reset_store(STATS_STORE)
+        cursors = stats["cursors"]
+
+        channels = [ch for ch in guild.text_channels if is_counted_channel(ch)]
+        new_messages = 0
+
+        async def count_channel(ch):
+            nonlocal new_messages
+
+            # Live capture has counted everything since this channel's last crawl
+            if capture and capture.is_synced(STATS_STORE, ch.id):
+                return True
+
+            cursor = cursors.get(str(ch.id))
+            if cursor is None:
+                history = ch.history(limit=None, oldest_first=True)
+            else:
+                history = ch.history(limit=None, after=discord.Object(id=cursor))
+
+            latest_id = cursor or 0
+            counted = []
             try:
-                async for msg in ch.history(limit=None):
+                async for msg in history:
+                    if capture and capture.reached_floor(STATS_STORE, ch.id, msg.id):
+                        break  # Counted by live capture from here on
+                    if msg.id > latest_id:
+                        latest_id = msg.id
                     if not isinstance(msg.author, discord.Member) or msg.author.bot:
                         continue
-                    name = msg.author.display_name
-                    message_counts.setdefault(name, 0)
-                    word_counts.setdefault(name, 0)
-                    message_counts[name] += 1
-                    word_counts[name] += len(msg.content.split())
+                    if counted_live(stats, ch.id, msg.id):
+                        continue  # Counted live in an earlier capture session
+                    counted.append((msg.author.id, msg.author.display_name, len(msg.content.split())))
             except discord.Forbidden:
                 logger.warning(f"Forbidden access to channel: {ch.name}, skipping.", extra={"category": ["background_tasks", "count_messages"]})
-                continue
+                return False
             except Exception as e:
                 logger.error(f"Error reading messages from channel {ch.name}: %s\n%s", e, traceback.format_exc(), extra={"category": ["background_tasks", "count_messages"]})
-                continue
-            scanned.append(ch.name)
+                return False
+
+            # Only apply counts & advance the cursor once the channel has been read completely
+            for author_id, name, words in counted:
+                record_message(stats, author_id, name, words)
+            new_messages += len(counted)
+            if capture:
+                latest_id = max(latest_id, capture.mark_synced(STATS_STORE, ch.id))
+            if latest_id:
+                advance_cursor(stats, ch.id, latest_id)
+            clear_live_ranges(stats, ch.id)
+            return True
+
+        results = await fetch_channels(channels, count_channel, category="count_messages")
+        scanned = [ch.name for ch, ok in zip(channels, results) if ok]
 
         try:
-            df = pd.DataFrame([
-                {"Name": n, "Message Count": message_counts[n], "Word Count": word_counts[n]}
-                for n in message_counts
-            ])
-            
-            df.sort_values("Message Count", ascending=False).head(10).drop('Word Count', axis=1).to_csv("../data/top_messages.csv", index=False)
-            df.sort_values("Word Count", ascending=False).head(10).drop('Message Count', axis=1).to_csv("../data/top_words.csv", index=False)
-            with open("../data/channels.txt", "w", encoding="utf-8") as f:
-                f.write("\n".join(scanned))
+            # Files are written from a copy in the executor; live capture keeps changing the shared stats
+            df_msg, df_words = await loop.run_in_executor(None, save_count_results, copy.deepcopy(stats), scanned)
 
             global last_update
             last_update = datetime.now(SGT)
-            logger.info("count_messages task completed and CSV files updated.", extra={"category": ["background_tasks", "count_messages"]})
+            logger.info(f"count_messages task completed with {new_messages} new messages counted and CSV files updated.", extra={"category": ["background_tasks", "count_messages"]})
         except Exception as e:
             logger.error(f"Error saving message stats CSV files: %s\n%s", e, traceback.format_exc(), extra={"category": ["background_tasks", "count_messages"]})
+            raise
+
+        await self.prerender_chart("message_count", df_msg, build_message_count)
+        await self.prerender_chart("word_count", df_words, build_word_count)
+        return new_messages
 
 
     async def collect_new_messages(self):
@@ -227,89 +235,72 @@ class BackgroundTasks(commands.Cog):
         guild = self.bot.get_guild(GUILD_ID)
 
         try:
-            data = []
+            if os.path.exists(ALL_MESSAGES_PARQUET):
+                # Reads & rewrites the whole legacy archive, so keep it off the event loop
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, migrate_legacy_archive, ALL_MESSAGES_PARQUET, {c.name: c.id for c in guild.text_channels})
+
+            capture = self.bot.get_cog("MessageCapture")
             last_seen_ids = load_last_seen_ids()
 
+            channels = []
             for channel in guild.text_channels:
-                blacklisted_category = 'Commands'
-                if channel.category and channel.category.name == blacklisted_category:
-                    logger.info(f"Skipping channel '{channel.name}' in excluded category '{blacklisted_category}'", extra={"category": ["background_tasks", "collect_new_messages"]})
+                if not is_archived_channel(channel):
+                    logger.info(f"Skipping channel '{channel.name}' in excluded category '{channel.category.name}'", extra={"category": ["background_tasks", "collect_new_messages"]})
                     continue
+                channels.append(channel)
+
+            async def collect_channel(channel):
+                # Live capture has archived everything since this channel's last crawl
+                if capture and capture.is_synced(ARCHIVE_STORE, channel.id):
+                    return 0
 
                 logger.info(f"Processing channel: {channel.name} (ID: {channel.id})", extra={"category": ["background_tasks", "collect_new_messages"]})
                 last_seen_id = last_seen_ids.get(str(channel.id))
                 
                 if last_seen_id is None:
+                    # Oldest first, so each flushed batch can be checkpointed and an interrupted backfill resumes
                     logger.info("No last seen ID found, fetching full history...", extra={"category": ["background_tasks", "collect_new_messages"]})
-                    history = channel.history(limit=None)
+                    history = channel.history(limit=None, oldest_first=True)
                 else:
                     logger.info(f"Fetching messages after ID: {last_seen_id}", extra={"category": ["background_tasks", "collect_new_messages"]})
                     history = channel.history(limit=None, after=discord.Object(id=last_seen_id))
                     
-                latest_id = last_seen_id or 0
                 channel_name = channel.name
-                message_count = 0
+                writer = MessageBatchWriter(on_flush=lambda latest_id: update_last_seen_id(channel.id, latest_id))
 
                 async for message in history:
-                    message_count += 1
-                    name = message.author.display_name
-                    created_at = message.created_at
-                    content = message.content
-
-                    for user in message.mentions:
-                        content = content.replace(f"<@{user.id}>", f"@{user.display_name}")
-                        content = content.replace(f"<@!{user.id}>", f"@{user.display_name}")
-
-                    for role in message.role_mentions:
-                        content = content.replace(f"<@&{role.id}>", f"@{role.name}")
-
-                    for mentioned_channel in message.channel_mentions:
-                        content = content.replace(f"<#{mentioned_channel.id}>", f"#{mentioned_channel.name}")
-
-                    if message.mention_everyone:
-                        content = content.replace("@everyone", "@everyone")
-                        content = content.replace("@here", "@here")
-
-                    data.append({
-                        "message_id": message.id,
-                        "author": name,
-                        "channel": channel_name,
-                        "timestamp": created_at,
-                        "content": content
-                    })
-
-                    if message.id > latest_id:
-                        latest_id = message.id
+                    if capture and capture.reached_floor(ARCHIVE_STORE, channel.id, message.id):
+                        break  # Archived by live capture from here on
+                    await writer.add(message_to_row(message))
                 
-                logger.info(f"Collected {message_count} messages from channel '{channel_name}'", extra={"category": ["background_tasks", "collect_new_messages"]})
-                last_seen_ids[str(channel.id)] = latest_id
-
-            save_last_seen_ids(last_seen_ids)
-            logger.info("Saved last seen message IDs.")
-
-            if data:
-                df = pd.DataFrame(data)
-                df.to_parquet(NEW_MESSAGES_PARQUET, index=False)
-                logger.info(f"Saved {len(data)} new messages to {NEW_MESSAGES_PARQUET}", extra={"category": ["background_tasks", "collect_new_messages"]})
-
-            if os.path.exists(ALL_MESSAGES_PARQUET):
-                old_df = pd.read_parquet(ALL_MESSAGES_PARQUET)
-                new_df = pd.read_parquet(NEW_MESSAGES_PARQUET)
-                combined = pd.concat([old_df, new_df]).drop_duplicates(subset="message_id")
-            else:
-                combined = pd.read_parquet(NEW_MESSAGES_PARQUET)
-
-            combined.to_parquet(ALL_MESSAGES_PARQUET, index=False)
-            logger.info("Updated combined messages saved to all_messages.parquet", extra={"category": ["background_tasks", "collect_new_messages"]})
-            
-            os.remove(NEW_MESSAGES_PARQUET)
-            logger.info("Temporary file new_messages.parquet removed.", extra={"category": ["background_tasks", "collect_new_messages"]})
+                await writer.flush()
+                if capture:
+                    update_last_seen_id(channel.id, capture.mark_synced(ARCHIVE_STORE, channel.id))
+                logger.info(f"Collected {writer.written} messages from channel '{channel_name}'", extra={"category": ["background_tasks", "collect_new_messages"]})
+                return writer.written
+
+            # Each channel appends to the archive and checkpoints its cursor after every flushed batch,
+            # so a failed channel resumes from its last batch next run
+            results = await fetch_channels(channels, collect_channel, category="collect_new_messages")
+            archived = sum(r or 0 for r in results)
+            await asyncio.get_running_loop().run_in_executor(None, mark_archive_updated)
+            logger.info(f"Archived {archived} new messages to {ARCHIVE_DIR}", extra={"category": ["background_tasks", "collect_new_messages"]})
+            return archived
         
         except Exception as e:
             logger.error(f"Error in collect_new_messages: %s\n%s", e, traceback.format_exc(), extra={"category": ["background_tasks", "collect_new_messages"]})
+            raise
+
+
+    async def compact_message_archive(self):
+        logger.info("Starting compact_message_archive task.")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, compact_archive)
 
 
-    async def collect_links(self):
+    # Scans only messages posted since the last run. full_rescan=True rereads the whole channel.
+    async def collect_links(self, full_rescan: bool = False):
         guild = self.bot.get_guild(GUILD_ID)
         target_channel = discord.utils.get(guild.text_channels, name="🎹┃weekly-sessions")
 
@@ -319,97 +310,111 @@ class BackgroundTasks(commands.Cog):
             return
 
         url_pattern = r'https?://\S+'
-        csv_path = "../data/links.csv"
 
         # Load existing URLs
-        existing_urls = set()
-        if os.path.exists(csv_path):
-            try:
-                with open(csv_path, mode="r", encoding="utf-8") as f:
-                    reader = csv.DictReader(f)
-                    existing_urls = {row["url"] for row in reader}
-                logger.info(f"Loaded {len(existing_urls)} existing URLs from links.csv.", extra={"category": ["background_tasks", "collect_links"]})
-            except Exception as e:
-                logger.error(f"Error reading links.csv: %s\n%s", e, traceback.format_exc(), extra={"category": ["background_tasks", "collect_links"]})
+        existing_urls = await run_db(load_link_urls)
+        logger.info(f"Loaded {len(existing_urls)} existing URLs from links table.", extra={"category": ["background_tasks", "collect_links"]})
+
+        last_seen_id = None if full_rescan else load_links_last_seen_id()
+        if last_seen_id is None:
+            logger.info("Scanning full weekly-sessions history for links.", extra={"category": ["background_tasks", "collect_links"]})
+            history = target_channel.history(limit=None, oldest_first=True)
+        else:
+            history = target_channel.history(limit=None, after=discord.Object(id=last_seen_id))
 
         new_links = []
+        latest_id = last_seen_id or 0
+        scan_complete = False
         try:
-            async for msg in target_channel.history(limit=None):
+            async for msg in history:
+                latest_id = max(latest_id, msg.id)
                 if not isinstance(msg.author, discord.Member) or msg.author.bot:
                     continue
 
                 links = re.findall(url_pattern, msg.content)
                 for url in links:
                     if "www.signupgenius.com" in url and url not in existing_urls:
-                        new_links.append({"url": url, "scanned": 0, "state": -1})
+                        new_links.append(url)
                         existing_urls.add(url)
+            scan_complete = True
         except Exception as e:
             logger.error(f"Error scanning messages in channel '{target_channel.name}': %s\n%s", e, traceback.format_exc(), extra={"category": ["background_tasks", "collect_links"]})
 
 
         if new_links:
             try:
-                file_exists = os.path.exists(csv_path)
-                with open(csv_path, mode="a", encoding="utf-8", newline="") as f:
-                    fieldnames = ["url", "scanned", "state"]
-                    writer = csv.DictWriter(f, fieldnames=fieldnames)
-
-                    if not file_exists:
-                        writer.writeheader()
-                    writer.writerows(new_links)
-
-                logger.info(f"Added {len(new_links)} new links to links.csv.", extra={"category": ["background_tasks", "collect_links"]})
+                await run_db(insert_links, new_links, state=STATE_NEW)
+                logger.info(f"Added {len(new_links)} new links to links table.", extra={"category": ["background_tasks", "collect_links"]})
             except Exception as e:
-                logger.error(f"Error writing to links.csv: %s\n%s", e, traceback.format_exc(), extra={"category": ["background_tasks", "collect_links"]})
+                scan_complete = False
+                logger.error(f"Error writing to links table: %s\n%s", e, traceback.format_exc(), extra={"category": ["background_tasks", "collect_links"]})
         else:
             logger.info("No new links found to add.", extra={"category": ["background_tasks", "collect_links"]})
 
+        # Advance the cursor only after a complete scan & save, so a failed run is retried
+        if scan_complete and latest_id:
+            save_links_last_seen_id(latest_id)
+
+
+    async def scrape_link(self, pool: DriverPool, link: str, scanned: bool):
+        try:
+            return await pool.run(self.scrape_and_record, link, scanned)
+        except asyncio.TimeoutError:
+            logger.error(f"Scraping timed out after {pool.timeout}s for link: {link}", extra={"category": ["background_tasks", "scrape_link"]})
+        except Exception as e:
+            logger.error(f"Error scraping link {link}: %s\n%s", e, traceback.format_exc(), extra={"category": ["background_tasks", "scrape_link"]})
+        return None
 
-    async def scrape_link(self, driver, link: str, df_existing: pd.DataFrame, df_links: pd.DataFrame):
-        loop = asyncio.get_running_loop()
-        partial_func = functools.partial(self.scrape_link_sync, driver, link, df_existing, df_links)
-        return await loop.run_in_executor(None, partial_func)
 
+    # With SIGNUPGENIUS_RECORD_DIR set, scraped pages are saved with their results as offline fixtures
+    def scrape_and_record(self, driver, link: str, scanned: bool):
+        result = self.scrape_link_sync(driver, link, scanned)
+        if SIGNUPGENIUS_RECORD_DIR and result and result["status"] == "scraped":
+            record_page(link, driver.page_source, result)
+        return result
 
-    # Function to scrape details from SignUpGenius
-    def scrape_link_sync(self, driver, link: str, df_existing: pd.DataFrame, df_links: pd.DataFrame):
+
+    # Function to scrape details from SignUpGenius. Runs on a pool worker thread, so it only
+    # returns what it found; apply_scrape_result merges it into the shared frames.
+    def scrape_link_sync(self, driver, link: str, scanned: bool):
         logger.info(f"Scraping link: {link}", extra={"category": ["background_tasks", "collect_links"]})
 
         # Navigate to the page
         driver.get(link)
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, "signupcontainer"))
-        )
+        try:
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.ID, "signupcontainer"))
+            )
+        except TimeoutException:
+            # Not a sign-up page (removed or never published), so stop retrying it every run
+            logger.warning(f"Scrape failed - sign-up container not found for link: {link}", extra={"category": ["background_tasks", "scrape_link_sync"]})
+            return {"url": link, "status": "unscrapable"}
+
+        if SCRAPE_EXTRACTION_MODE == "bulk":
+            return self.scrape_page_bulk(driver, link, scanned)
         
         scrapable = True
         try:
             # Extract information
             date = driver.find_element(By.XPATH, f'//*[@id="signupcontainer"]/div[1]/div[2]/div[2]/div[2]/div/div[2]').text
-            date = re.sub(r"\s*\([^)]*\)", "", date).strip() # Remove day
-            date = datetime.strptime(date, "%m/%d/%Y").date()
+            date = parse_session_date(date)
             
             today = datetime.now(SGT).date()
 
-            if today > date and df_links.loc[df_links["url"] == link, "scanned"].values[0] == 1:
+            if today > date and scanned:
                 logger.info(f"Session date passed and already scanned for link: {link}")
-                df_links.loc[df_links["url"] == link, "state"] = 2  # Indicate weekly session has passed
-                return df_existing, df_links
+                return {"url": link, "status": "passed", "date": date}
 
             room = driver.find_element(By.XPATH, f'//*[@id="signupcontainer"]/div[1]/div[2]/div[2]/div[4]/div/div[2]/span').text
 
-            # Remove existing records related to this session
-            if not df_existing.empty:
-                df_existing = df_existing[~((df_existing["date"] == date) & (df_existing["room"] == room))]
-
         except NoSuchElementException:
             scrapable = False
             logger.warning(f"Scrape failed - necessary elements not found for link: {link}", extra={"category": ["sheet_retriever", "scrape_link_sync"]})
         
 
         if scrapable == False:
-            df_links.loc[df_links["url"] == link, "state"] = 0  # Indicate link is unscrapable
             logger.warning('Link cannot be scrapped.')
-            return df_existing, df_links
+            return {"url": link, "status": "unscrapable"}
 
         bookings = []
         i = 1
@@ -428,8 +433,7 @@ class BackgroundTasks(commands.Cog):
                 time_slot = find_with_fallback(driver, [time_slot_xpath_3, time_slot_xpath_4]).text
 
                 # Clean time slot value
-                time_slot = re.sub(r"(\d{2})(\d{2})", r"\1 \2", time_slot)
-                time_slot = re.sub(r"\s*-\s*", " - ", time_slot)
+                time_slot = clean_time_slot(time_slot)
 
                 details_found = True
                 try:
@@ -483,8 +487,6 @@ class BackgroundTasks(commands.Cog):
                     except NoSuchElementException:
                         break
 
-                    df_links.loc[df_links["url"] == link, "scanned"] = 1  # Flag that link has been scrapped successfully
-                    df_links.loc[df_links["url"] == link, "state"] = 1  # Indicate weekly session has not passed
                     bookings.append({
                         "date": date,
                         "room": room,
@@ -498,68 +500,99 @@ class BackgroundTasks(commands.Cog):
                 break
             i += 1
 
-        df_new = pd.DataFrame(bookings)
-        df_existing = pd.concat([df_new, df_existing], ignore_index=True)
-        df_existing['admin_num'] = df_existing['admin_num'].str.extract(r'(\b\d{6}[A-Za-z]\b)')[0].str.upper()
         logger.info(f"Scraping complete for link: {link}", extra={"category": ["background_tasks", "scrape_link_sync"]})
-        return df_existing, df_links
+        return {"url": link, "status": "scraped", "date": date, "room": room, "bookings": bookings}
 
 
-    async def collect_and_scrape(self):
-        logger.info("Starting collect_and_scrape process.", extra={"category": ["background_tasks", "collect_and_scrape"]})
-        await self.collect_links()
+    # Same result as the XPath extraction, but the page is read in two script round trips
+    # whatever the number of slots & participants
+    def scrape_page_bulk(self, driver, link: str, scanned: bool):
+        header = extract_header(driver)
+        if header is None:
+            logger.warning(f"Scrape failed - necessary elements not found for link: {link}", extra={"category": ["background_tasks", "scrape_page_bulk"]})
+            return {"url": link, "status": "unscrapable"}
 
-        links_path = "../data/links.csv"
-        df_links = pd.read_csv(links_path)
+        date, room = header
+        today = datetime.now(SGT).date()
+        if today > date and scanned:
+            logger.info(f"Session date passed and already scanned for link: {link}")
+            return {"url": link, "status": "passed", "date": date}
 
-        # Filter out unscrapable links
-        links_to_scan = df_links[df_links["state"] != 0]["url"].tolist()
+        bookings = extract_bookings(driver, date, room)
+        logger.info(f"Scraping complete for link: {link} ({len(bookings)} bookings)", extra={"category": ["background_tasks", "scrape_page_bulk"]})
+        return {"url": link, "status": "scraped", "date": date, "room": room, "bookings": bookings}
 
-        if not links_to_scan:
-            logger.info("No unscanned links to scrape.", extra={"category": ["background_tasks", "collect_and_scrape"]})
+
+    def apply_scrape_result(self, bookings: BookingsStore, df_links: pd.DataFrame, result: dict):
+        link = result["url"]
+        df_links.loc[df_links["url"] == link, "last_scraped"] = datetime.now(SGT).date()
+
+        if result["status"] == "unscrapable":
+            df_links.loc[df_links["url"] == link, "state"] = STATE_UNSCRAPABLE  # Indicate link is unscrapable
             return
 
-        df_path = "../data/all_bookings.csv"
-        df_existing = pd.read_csv(df_path) if os.path.exists(df_path) else pd.DataFrame(columns=["date", "room", "time_slot", "name", "admin_num"])
-        df_existing["date"] = pd.to_datetime(df_existing["date"]).dt.date
+        # Remember the session date so later runs can schedule or skip this link without loading it
+        df_links.loc[df_links["url"] == link, "session_date"] = result["date"]
 
-        try:
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36")
-            driver = webdriver.Chrome(options=chrome_options)
-            logger.info('Chrome WebDriver started successfully in headless mode.', extra={"category": ["background_tasks", "collect_and_scrape"]})
+        if result["status"] == "passed":
+            df_links.loc[df_links["url"] == link, "state"] = STATE_PASSED  # Indicate weekly session has passed
+            return
 
-            for url in links_to_scan:
-                df_existing, df_links = await self.scrape_link(driver, url, df_existing, df_links)
-                
-        except WebDriverException as e:
-            logger.error(f"Failed to start Chrome WebDriver: %s\n%s", e, traceback.format_exc(), extra={"category": ["background_tasks", "collect_and_scrape"]})
-            return df_existing, df_links
-        
+        # Replace existing records related to this session
+        bookings.replace_session(result["date"], result["room"], result["bookings"])
+
+        if result["bookings"]:
+            df_links.loc[df_links["url"] == link, "scanned"] = 1  # Flag that link has been scrapped successfully
+            df_links.loc[df_links["url"] == link, "state"] = STATE_UPCOMING  # Indicate weekly session has not passed
+
+
+    async def collect_and_scrape(self, full_rescan: bool = False):
+        logger.info("Starting collect_and_scrape process.", extra={"category": ["background_tasks", "collect_and_scrape"]})
+        await self.collect_links(full_rescan=full_rescan)
+
+        df_links = ensure_lifecycle_columns(await run_db(load_links))
+
+        # Finalize past sessions from their stored dates, then only load pages that are due.
+        # Unscrapable and finalized links are never fetched again.
+        today = datetime.now(SGT).date()
+        df_links = finalize_passed_links(df_links, today)
+        links_to_scan = links_due(df_links, today)
+
+        if not links_to_scan:
+            logger.info("No links due for scraping.", extra={"category": ["background_tasks", "collect_and_scrape"]})
+            await run_db(save_links, df_links)
+            return 0
+
+        # Scrape links in parallel across the driver pool
+        scanned = dict(zip(df_links["url"], df_links["scanned"] == 1))
+        pool = DriverPool()
+        logger.info(f"Scraping {len(links_to_scan)} links with a pool of {pool.size} drivers.", extra={"category": ["background_tasks", "collect_and_scrape"]})
+        try:
+            results = dict(zip(links_to_scan, await asyncio.gather(*(self.scrape_link(pool, url, scanned[url]) for url in links_to_scan))))
         finally:
-            if driver:
-                driver.quit()
-            
+            await pool.close()
 
-        # Get academic year for each date
-        def get_academic_year(date):
-            ay_start = datetime(date.year, 4, 1).date()
-            if date >= ay_start:
-                return date.year
-            else:
-                return date.year - 1
+        # Merge results in link order so the bookings store ends up the same however the workers interleave
+        def merge_results(conn):
+            bookings = BookingsStore(conn)
+            for url in links_to_scan:
+                if results.get(url) is not None:
+                    self.apply_scrape_result(bookings, df_links, results[url])
 
-        df_existing['AY'] = df_existing['date'].apply(get_academic_year)
+        await run_db(merge_results)
 
-        # Update CSVs
+        # Sessions were written as they were merged; persist link states
         try:
-            df_existing.to_csv(df_path, index=False)
-            df_links.to_csv(links_path, index=False)
+            await run_db(save_links, df_links)
             logger.info("Scraped data saved successfully.")
         except Exception as e:
-            logger.error(f"Failed to save scraped data CSV files: %s\n%s", e, traceback.format_exc(), extra={"category": ["background_tasks", "collect_and_scrape"]})
+            logger.error(f"Failed to save link states: %s\n%s", e, traceback.format_exc(), extra={"category": ["background_tasks", "collect_and_scrape"]})
+            raise
+
+        current_ay = get_academic_year(today)
+        df_rollups = await run_db(load_booking_rollups, ays=[current_ay])
+        await self.prerender_chart("weekly_session_popularity", {"ay": current_ay, "rollups": df_rollups}, build_weekly_session_popularity)
+        return sum(results.get(url) is not None for url in links_to_scan)
 
 
     @tasks.loop(seconds=5)
@@ -9,6 +9,9 @@ from openpyxl.worksheet.table import Table, TableStyleInfo
 from openpyxl.utils import get_column_letter
 import os
 from utils.setup_logger import log_slash_command
+from utils.database import load_booking_slot_rollups, load_bookings
+from utils.async_db import run_db
+from utils.roster_index import get_roster
 import logging
 
 
@@ -32,30 +35,19 @@ class EXCOExclusive(commands.Cog):
 
         log_slash_command(logger, interaction)
         
-        guild = interaction.guild
+        roster = get_roster(interaction.guild)
         rows = []
-        for m in guild.members:
-            if m.bot: continue
-            roles = {r.name for r in m.roles}
-
-            # Assign role conditionally
-            if roles & {"Member","Alumni","Current EXCO"}:
-                if "Current EXCO" in roles:
-                    status = "Current EXCO"
-                elif "Alumni" in roles:
-                    status = "Alumni"
-                else:
-                    status = "Member"
-
-                # Determine piano-playing group based on roles
-                pg = ", ".join(r for r in roles if r in {"Advanced","Intermediate","Novice","Foundational"}) or "None"
-                rows.append({
-                    'Discord_Username': m.name,
-                    'Name': m.nick or "None",
-                    'Role': status,
-                    'Piano_Playing_Group': pg,
-                    'Joined_Server_Time': m.joined_at.astimezone(SGT).strftime("%Y-%m-%d %H:%M:%S")
-                })
+        ids = roster.by_status["Current EXCO"] | roster.by_status["Alumni"] | roster.by_status["Member"]
+        for m in sorted(roster.entries(ids), key=lambda m: m["joined_at"]):
+            # Determine piano-playing group based on roles
+            pg = ", ".join(m["piano_groups"]) or "None"
+            rows.append({
+                'Discord_Username': m["name"],
+                'Name': m["nick"] or "None",
+                'Role': m["status"],
+                'Piano_Playing_Group': pg,
+                'Joined_Server_Time': m["joined_at"].astimezone(SGT).strftime("%Y-%m-%d %H:%M:%S")
+            })
 
         if not rows:
             logger.warning("No members and alumni found for Excel export.", extra={"category": ["exco_exclusive", "members_details"]})
@@ -100,27 +92,35 @@ class EXCOExclusive(commands.Cog):
 
         log_slash_command(logger, interaction)
 
-        df = pd.read_csv('../data/all_bookings.csv')
+        df = await run_db(load_bookings)
+        # Registrant counts per time slot come straight from the slot rollups
+        df_slots = await run_db(load_booking_slot_rollups)
+        df_slots = df_slots.sort_values(["date", "room", "time_slot"], ascending=[False, True, True])
+        sheets = {"Nominal Rolls": (df, "NominalRollsTable"), "Registrants per Slot": (df_slots, "SlotRegistrantsTable")}
+
         fname = '../data/all_bookings.xlsx'
-        df.to_excel(fname, index=False)
+        with pd.ExcelWriter(fname) as writer:
+            for sheet_name, (sheet_df, _) in sheets.items():
+                sheet_df.to_excel(writer, sheet_name=sheet_name, index=False)
 
-        # Load the workbook and convert the sheet to a table
+        # Load the workbook and convert each sheet to a table
         wb = load_workbook(fname)
-        ws = wb.active
-
-        # Define the table range and name
-        tab_ref = f"A1:{get_column_letter(len(df.columns))}{len(df)+1}"
-        tbl = Table(displayName="NominalRollsTable", ref=tab_ref)
-
-        # Add style to the table
-        style = TableStyleInfo(name="TableStyleLight18", showRowStripes=True)
-        tbl.tableStyleInfo = style
-        ws.add_table(tbl)
-
-        # Auto-adjust column widths
-        for col in ws.columns:
-            max_len = max(len(str(c.value)) for c in col)
-            ws.column_dimensions[get_column_letter(col[0].column)].width = max_len + 2
+        for sheet_name, (sheet_df, table_name) in sheets.items():
+            ws = wb[sheet_name]
+
+            # Define the table range and name
+            tab_ref = f"A1:{get_column_letter(len(sheet_df.columns))}{len(sheet_df)+1}"
+            tbl = Table(displayName=table_name, ref=tab_ref)
+
+            # Add style to the table
+            style = TableStyleInfo(name="TableStyleLight18", showRowStripes=True)
+            tbl.tableStyleInfo = style
+            ws.add_table(tbl)
+
+            # Auto-adjust column widths
+            for col in ws.columns:
+                max_len = max(len(str(c.value)) for c in col)
+                ws.column_dimensions[get_column_letter(col[0].column)].width = max_len + 2
 
         wb.save(fname)
         logger.info("Excel table formatting complete.", extra={"category": ["exco_exclusive", "weekly_session_nominal_rolls"]})
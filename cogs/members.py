@@ -6,6 +6,7 @@ from utils.permissions import has_allowed_role_and_channel
 import os
 from utils.setup_logger import log_slash_command
 import logging
+from utils.roster_index import get_roster
 
 
 GUILD_ID = int(os.getenv("GUILD_ID"))
@@ -29,8 +30,8 @@ class Members(commands.Cog):
 
         log_slash_command(logger, interaction)
 
-        guild = interaction.guild
-        exco = sorted([m.display_name for m in guild.members if any(r.name=="Current EXCO" for r in m.roles)], key=str.lower)
+        roster = get_roster(interaction.guild)
+        exco = roster.display_names(roster.with_roles("Current EXCO"))
         
         if not exco:
             logger.warning("No current EXCO members found.")
@@ -63,11 +64,11 @@ class Members(commands.Cog):
                 logger.info(f"Piano group selected: {grp} by {inter.user.display_name}")
 
                 # Get list of members from the selected group (excluding alumni)
-                names = [m.display_name for m in inter.guild.members if grp in {r.name for r in m.roles} and "Member" in {r.name for r in m.roles}]
+                roster = get_roster(inter.guild)
+                names = roster.display_names(roster.with_roles(grp, "Member"))
                 
-                # If there are members in the group, sort and display their names
+                # If there are members in the group, display their names
                 if names:
-                    names.sort(key=str.lower)
                     out = "\n".join(f"- {n}" for n in names)
                     logger.info(f"Listed {len(names)} members in group {grp}.")
                     await inter.response.send_message(f"**{grp} members:**\n{out}", ephemeral=True)
@@ -0,0 +1,217 @@
+import discord
+from discord.ext import commands, tasks
+import pandas as pd
+import os
+import copy
+import asyncio
+import logging
+import traceback
+from utils.channel_last_message_id_tracker import update_last_seen_id
+from utils.message_archive import ARCHIVE_BATCH_SIZE, append_messages, deleted_message_row, is_archived_channel, message_to_row
+from utils.message_stats_tracker import advance_cursor, counted_live, export_top_csvs, is_counted_channel, load_message_stats, record_live_range, record_message, save_message_stats, unrecord_message
+
+
+GUILD_ID = int(os.getenv("GUILD_ID"))
+CAPTURE_FLUSH_SECONDS = int(os.getenv("CAPTURE_FLUSH_SECONDS", "60"))
+
+# Stores fed by live capture, each with its own crawl cursor
+ARCHIVE_STORE = "archive"
+STATS_STORE = "stats"
+
+# Get logger
+logger = logging.getLogger("pe_helper")
+
+
+def save_archive_cursors(cursors):
+    for channel_id, message_id in cursors.items():
+        update_last_seen_id(channel_id, message_id)
+
+
+def save_stats(stats, export):
+    save_message_stats(stats)
+    if export:
+        export_top_csvs(stats)
+
+
+# Captures messages, edits & deletes from gateway events and flushes them in batches
+# to the message archive and message stats. The scheduled crawls then only backfill
+# gaps: for each channel, the first message seen live this session is its "floor",
+# and the crawl only reads from its cursor up to that floor. Once a channel's gap has
+# been filled it is "synced" and live flushes advance its cursor directly.
+class MessageCapture(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.rows = []
+        self.counted = []
+        self.uncounted = []
+        self.pending_latest = {}
+        self.latest = {}
+        self.floors = {ARCHIVE_STORE: {}, STATS_STORE: {}}
+        self.synced = {ARCHIVE_STORE: set(), STATS_STORE: set()}
+        self.flush_lock = asyncio.Lock()
+        self.flush_loop.start()
+
+
+    async def cog_unload(self):
+        self.flush_loop.cancel()
+        await self.flush()
+
+
+    # A new gateway session may have missed events, so every channel needs a gap fill again
+    @commands.Cog.listener()
+    async def on_ready(self):
+        await self.flush()
+        for store in self.floors:
+            self.reset_store(store)
+        logger.info("Live message capture ready.", extra={"category": ["message_capture", "on_ready"]})
+
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.guild is None or message.guild.id != GUILD_ID:
+            return
+
+        channel_id = message.channel.id
+        for floors in self.floors.values():
+            floors.setdefault(channel_id, message.id)
+        self.pending_latest[channel_id] = max(message.id, self.pending_latest.get(channel_id, 0))
+
+        if is_archived_channel(message.channel):
+            self.rows.append(message_to_row(message))
+
+        if isinstance(message.author, discord.Member) and not message.author.bot and is_counted_channel(message.channel):
+            self.counted.append((message.author.id, message.author.display_name, len(message.content.split()), channel_id))
+
+        if len(self.rows) >= ARCHIVE_BATCH_SIZE:
+            await self.flush()
+
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        if payload.guild_id != GUILD_ID or payload.message is None:
+            return
+        if is_archived_channel(payload.message.channel):
+            self.rows.append(message_to_row(payload.message, event="edit"))
+
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        cached = [payload.cached_message] if payload.cached_message else []
+        self.capture_deletes(payload.guild_id, payload.channel_id, [payload.message_id], cached)
+
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        self.capture_deletes(payload.guild_id, payload.channel_id, payload.message_ids, payload.cached_messages)
+
+
+    def capture_deletes(self, guild_id, channel_id, message_ids, cached_messages=()):
+        if guild_id != GUILD_ID:
+            return
+        self.uncount_deleted(cached_messages)
+        channel = self.bot.get_channel(channel_id)
+        if channel is None or not is_archived_channel(channel):
+            return
+        self.rows.extend(deleted_message_row(message_id, channel) for message_id in message_ids)
+
+
+    # Deleted messages are taken back out of the stats. Only messages still in discord.py's cache
+    # carry an author & word count; deletes of uncached (older) messages stay counted.
+    def uncount_deleted(self, messages):
+        for message in messages:
+            if not isinstance(message.author, discord.Member) or message.author.bot or not is_counted_channel(message.channel):
+                continue
+            # Seen live means counted live; anything else only counts once the crawl's cursor has passed it
+            live = self.reached_floor(STATS_STORE, message.channel.id, message.id)
+            self.uncounted.append((message.author.id, len(message.content.split()), message.channel.id, message.id, live))
+
+
+    # Crawls stop reading a channel once they reach the first message captured live
+    def reached_floor(self, store, channel_id, message_id):
+        floor = self.floors[store].get(channel_id)
+        return floor is not None and message_id >= floor
+
+
+    def is_synced(self, store, channel_id):
+        return channel_id in self.synced[store]
+
+
+    # Called by a crawl once a channel's gap is filled. Returns the newest message ID
+    # already flushed live, which the crawl should use as the channel's cursor.
+    def mark_synced(self, store, channel_id):
+        self.synced[store].add(channel_id)
+        return self.latest.get(channel_id, 0)
+
+
+    def reset_store(self, store):
+        self.floors[store].clear()
+        self.synced[store].clear()
+        if store == STATS_STORE:
+            self.counted.clear()
+            self.uncounted.clear()
+
+
+    async def flush(self):
+        async with self.flush_lock:
+            rows, self.rows = self.rows, []
+            counted, self.counted = self.counted, []
+            uncounted, self.uncounted = self.uncounted, []
+            pending_latest, self.pending_latest = self.pending_latest, {}
+
+            try:
+                if rows:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(None, append_messages, pd.DataFrame(rows))
+            except Exception as e:
+                # Put everything back so the next flush retries it
+                logger.error(f"Error writing captured messages to archive: %s\n%s", e, traceback.format_exc(), extra={"category": ["message_capture", "flush"]})
+                self.rows[:0] = rows
+                self.counted[:0] = counted
+                self.uncounted[:0] = uncounted
+                for channel_id, message_id in pending_latest.items():
+                    self.pending_latest[channel_id] = max(message_id, self.pending_latest.get(channel_id, 0))
+                return
+
+            try:
+                loop = asyncio.get_running_loop()
+                archive_cursors = {}
+                for channel_id, message_id in pending_latest.items():
+                    self.latest[channel_id] = max(message_id, self.latest.get(channel_id, 0))
+                    if channel_id in self.synced[ARCHIVE_STORE]:
+                        archive_cursors[channel_id] = self.latest[channel_id]
+                if archive_cursors:
+                    await loop.run_in_executor(None, save_archive_cursors, archive_cursors)
+
+                if counted or uncounted or pending_latest:
+                    # The shared stats are changed here on the loop, where the crawl also changes them;
+                    # writing the files happens on a copy in the executor
+                    stats = await loop.run_in_executor(None, load_message_stats)
+                    for author_id, name, words, channel_id in counted:
+                        record_message(stats, author_id, name, words)
+                    # Remember what was counted live where the crawl has not caught up yet
+                    for channel_id in {c for *_, c in counted}:
+                        floor = self.floors[STATS_STORE].get(channel_id)
+                        if channel_id not in self.synced[STATS_STORE] and floor is not None:
+                            record_live_range(stats, channel_id, floor, self.latest[channel_id])
+                    for author_id, words, channel_id, message_id, live in uncounted:
+                        if live or message_id <= stats["cursors"].get(str(channel_id), 0) or counted_live(stats, channel_id, message_id):
+                            unrecord_message(stats, author_id, words)
+                    for channel_id in pending_latest:
+                        if channel_id in self.synced[STATS_STORE]:
+                            advance_cursor(stats, channel_id, self.latest[channel_id])
+                    await loop.run_in_executor(None, save_stats, copy.deepcopy(stats), bool(counted or uncounted))
+
+                if rows or counted:
+                    logger.info(f"Flushed {len(rows)} captured events and {len(counted)} counted messages.", extra={"category": ["message_capture", "flush"]})
+
+            except Exception as e:
+                logger.error(f"Error updating cursors & stats for captured messages: %s\n%s", e, traceback.format_exc(), extra={"category": ["message_capture", "flush"]})
+
+
+    @tasks.loop(seconds=CAPTURE_FLUSH_SECONDS)
+    async def flush_loop(self):
+        await self.flush()
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(MessageCapture(bot))
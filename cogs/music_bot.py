@@ -3,7 +3,6 @@ from discord.ext import commands
 from discord import app_commands, Object
 from utils.audio_essentials import *
 from utils.variables import currently_playing
-from youtubesearchpython import VideosSearch
 from utils.permissions import has_allowed_role_and_channel
 import logging
 import traceback
@@ -106,40 +105,32 @@ class MusicBot(commands.Cog):
             await interaction.response.send_message("You need to be in the same VC as PE Helper to perform this command.")
             return
         
-        await interaction.response.defer()
+        # Queue immediately; lookup & download happen in the background
+        entry = new_queue_entry(search)
+        video_queue.append(entry)
+        logger.info(f"Queued (pending): {search} by {interaction.user}")
+        await interaction.response.send_message(f"Queued: {search}\nDownloading in the background, see `/music view-queue` for progress.")
+        self.bot.loop.create_task(self.prepare_and_play(entry, interaction))
 
+
+    async def prepare_and_play(self, entry, interaction: discord.Interaction):
         try:
-            if not any([regex.search(search) for regex in regexs]):
-                video_search = VideosSearch(search, limit=1)
-                video = video_search.result()['result'][0]
-                video_id = video["id"]
-                if not check_video_length(video_id):
-                    await interaction.followup.send("Only songs under 1 hour can be played.")
-                    return
-                path = get_audio(video['link'])
-                videoInfo = {'title': video['title'], 'link': video['link'], 'id': video_id, 'path': path,
-                            'duration': video['duration'], 'displayTitle': video['title']}
-            else:
-                video_id = get_id(search)
-                youtube = googleapiclient.discovery.build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
-                request = youtube.videos().list(part="snippet, contentDetails", id=video_id)
-                response = request.execute()
-                video = response['items'][0]['snippet']
-                title = video['title']
-                link = search
-                duration = response['items'][0]['contentDetails']['duration']
-                path = get_audio(link)
-                videoInfo = {'title': title, 'link': link, 'id': video_id, 'path': path, 'duration': duration,
-                            'displayTitle': title}
-                
-            video_queue.append(videoInfo)
-            logger.info(f"Added to queue: {videoInfo['title']} ({videoInfo['duration']}) by {interaction.user}")
-            await interaction.followup.send(f"Added: {videoInfo['title']}\nLink: {videoInfo['link']} - {videoInfo['duration']}")
-            refresh_song(self.bot, GUILD_ID)
-            
+            await prepare_entry(entry)
+        except VideoTooLong:
+            if entry in video_queue:
+                video_queue.remove(entry)
+            await interaction.followup.send("Only songs under 1 hour can be played.")
+            return
         except Exception as e:
+            if entry in video_queue:
+                video_queue.remove(entry)
             logger.error(f"Failed to add song to queue: : %s\n%s", e, traceback.format_exc(), extra={"category": ["music_bot", "add_queue"]})
-            await interaction.followup.send("❌ An unexpected error occurred.", ephemeral=True)
+            await interaction.followup.send(f"❌ Could not download {entry['title']}.", ephemeral=True)
+            return
+
+        logger.info(f"Added to queue: {entry['title']} ({entry['duration']}) by {interaction.user}")
+        await interaction.followup.send(f"Added: {entry['title']}\nLink: {entry['link']} - {entry['duration']}")
+        refresh_song(self.bot, GUILD_ID)
 
 
     @music_group.command(name="view-queue", description="View all songs in a queue")
@@ -155,7 +146,10 @@ class MusicBot(commands.Cog):
             return
 
         def formatting(info):
-            return f"{info['displayTitle']} - {info['duration']}\nLink: {info['link']}"
+            if info is currently_playing:
+                return f"{info['displayTitle']} - {info['duration']}\nLink: {info['link']}"
+            link = f"\nLink: {info['link']}" if info['link'] else ""
+            return f"{info['displayTitle']} - {info['duration'] or '?'} ({describe_status(info)}){link}"
 
         embed = discord.Embed(title="Music Queue", description="\n\n".join(
             [f"{formatting(i)}" if idx == 0 else f"{idx}: {formatting(i)}" for idx, i in enumerate(queue_info)]))
@@ -0,0 +1,81 @@
+import discord
+from discord.ext import commands
+import os
+import logging
+from utils.roster_index import get_roster
+
+
+GUILD_ID = int(os.getenv("GUILD_ID"))
+
+# Get logger
+logger = logging.getLogger("pe_helper")
+
+
+# Keeps the roster index in step with member & role events
+class Roster(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+
+    def roster_for(self, guild):
+        if guild is None or guild.id != GUILD_ID:
+            return None
+        return get_roster(guild)
+
+
+    # Events may have been missed while disconnected, so rebuild on every new session
+    @commands.Cog.listener()
+    async def on_ready(self):
+        guild = self.bot.get_guild(GUILD_ID)
+        if guild:
+            get_roster(guild).build(guild)
+
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        roster = self.roster_for(member.guild)
+        if roster:
+            roster.add(member)
+
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        roster = self.roster_for(member.guild)
+        if roster:
+            roster.remove(member.id)
+
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.roles == after.roles and before.nick == after.nick and before.name == after.name:
+            return
+        roster = self.roster_for(after.guild)
+        if roster:
+            roster.add(after)
+
+
+    # Username & global display name changes arrive as user updates, not member updates
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        if before.name == after.name and before.global_name == after.global_name:
+            return
+        guild = self.bot.get_guild(GUILD_ID)
+        member = guild.get_member(after.id) if guild else None
+        roster = self.roster_for(guild)
+        if roster and member:
+            roster.add(member)
+
+
+    # Entries hold role names, so a renamed role needs a rebuild
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        if before.name == after.name:
+            return
+        roster = self.roster_for(after.guild)
+        if roster:
+            logger.info(f"Role '{before.name}' renamed to '{after.name}', rebuilding roster index.", extra={"category": ["roster", "on_guild_role_update"]})
+            roster.build(after.guild)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Roster(bot))
@@ -2,8 +2,9 @@ import discord
 from discord.ext import commands
 from discord import app_commands, Object
 from utils.permissions import has_allowed_role_and_channel
-import pandas as pd
 from utils.web_searching import search_scores
+from utils.database import increment_composer, load_composers, seed_composers
+from utils.async_db import run_db
 from utils.setup_logger import log_slash_command
 import os
 import logging
@@ -15,31 +16,16 @@ GUILD_ID = int(os.getenv("GUILD_ID"))
 composers = ["Chopin", "J.S Bach", "Beethoven", "Mozart", "Liszt", "Rachmaninoff", "Debussy", "R.Schumann", "C.Schumann",
              "Schubert", "Tchaikovsky", "Czerny", "Haydn", "Mendelssohn", "Moszkowski", "Ravel", "Erik Satie", "Scarlatti"]
 
-file_path = "../data/composers.csv"
 logger = logging.getLogger("pe_helper")
 
 
-try:
-    df = pd.read_csv(file_path)
-except FileNotFoundError:
-    data = {"Composers": composers, "Searches": [0 for _ in range(len(composers))]}
-    df = pd.DataFrame(data)
-    df.to_csv(file_path, index=False)
-
-
-def update_composers(composer, increment=1):
-    df = pd.read_csv(file_path)
-    current_searches = df.loc[df['Composers'] == composer, "Searches"]
-    if not current_searches.empty:
-        new_quantity = int(current_searches.iloc[0]) + increment
-        df.loc[df['Composers'] == composer, "Searches"] = new_quantity
-        df.to_csv(file_path, index=False)
+async def update_composers(composer, increment=1):
+    await run_db(increment_composer, composer, increment)
 
 
 async def classical_composers_autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
-    df = pd.read_csv(file_path)
-    final_df = df.sort_values(by="Searches", ascending=False)
-    valid_composers = list(final_df['Composers'])
+    df = await run_db(load_composers)  # Sorted by searches
+    valid_composers = list(df['Composers'])
 
     filtered = [i for i in valid_composers if current.lower() in i.lower()] if current else valid_composers
     return [app_commands.Choice(name=c, value=c) for c in filtered[:25]]
@@ -62,7 +48,7 @@ class ScoreSearcher(commands.Cog):
         log_slash_command(logger, interaction)
 
         try:
-            update_composers(composer)
+            await update_composers(composer)
             search_term = f"{piece} - {composer}"
             results = search_scores(search_term, interaction)
             scores = results['imslp_scores']
@@ -80,4 +66,5 @@ class ScoreSearcher(commands.Cog):
 
 
 async def setup(bot: commands.Bot):
+    await run_db(seed_composers, composers)
     await bot.add_cog(ScoreSearcher(bot), guild=Object(id=GUILD_ID))
\ No newline at end of file
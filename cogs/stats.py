@@ -4,13 +4,19 @@ from discord import app_commands, Object
 from utils.permissions import has_allowed_role_and_channel
 from utils.variables import last_update
 import pandas as pd
-import plotly.graph_objects as go
 from io import BytesIO
 from utils.setup_logger import log_slash_command
 import logging
 from datetime import datetime
 from utils.variables import SGT
+from utils.database import load_booking_rollups
+from utils.async_db import run_db
+from utils.roster_index import get_roster
+from utils.bookings_store import get_academic_year
+from utils.charts import build_message_count, build_piano_groups, build_weekly_session_popularity, build_word_count
+from utils.chart_cache import chart_png
 import os
+import asyncio
 import traceback
 
 
@@ -20,6 +26,15 @@ GUILD_ID = int(os.getenv("GUILD_ID"))
 logger = logging.getLogger("pe_helper")
 
 
+def read_channels():
+    with open("../data/channels.txt", "r", encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def read_top_csvs():
+    return pd.read_csv("../data/top_messages.csv"), pd.read_csv("../data/top_words.csv")
+
+
 class Stats(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
@@ -35,52 +50,11 @@ class Stats(commands.Cog):
 
         log_slash_command(logger, interaction)
 
-        guild = interaction.guild
-        count_dict = {"Advanced": 0, "Intermediate": 0, "Novice": 0, "Foundational": 0}
-
-        for m in guild.members:
-            if m.bot:
-                continue
-            roles = {r.name for r in m.roles}
-            if "Member" in roles:  # Obtain current members only
-                if "Advanced" in roles:
-                    count_dict["Advanced"] += 1
-                elif "Intermediate" in roles:
-                    count_dict["Intermediate"] += 1
-                elif "Novice" in roles:
-                    count_dict["Novice"] += 1
-                elif "Foundational" in roles:
-                    count_dict["Foundational"] += 1
+        count_dict = get_roster(interaction.guild).piano_group_counts()
 
         logger.info(f"Counting of members in piano groups was successful.", extra={"category": ["stats", "piano_groups"]})
 
-        # Generate pie chart for roles
-        labels = ["Foundational", "Novice", "Intermediate", "Advanced"]
-        values = [count_dict[label] for label in labels]
-
-        label_colors = {
-            "Advanced": "#05668d",
-            "Intermediate": "#427aa1",
-            "Novice": "#679436",
-            "Foundational": "#a5be00"
-        }
-
-        fig = go.Figure(data=[go.Pie(
-            labels=labels,
-            values=values,
-            marker=dict(colors=[label_colors[label] for label in labels]),
-            textinfo='value+percent',
-            sort=False
-        )])
-        fig.update_layout(
-            title="Piano-Playing Groups of Current Members",
-            legend=dict(traceorder="normal")
-        )
-
-        # Save the figure to an image in memory
-        buf = BytesIO()
-        fig.write_image(buf, format="png")
-        buf.seek(0)
+        buf = BytesIO(await chart_png("piano_groups", count_dict, build_piano_groups))
 
         try:
             await interaction.followup.send(file=discord.File(buf, "piano_groups.png"))
@@ -97,63 +71,30 @@ class Stats(commands.Cog):
 
         log_slash_command(logger, interaction)
 
+        loop = asyncio.get_running_loop()
+
         try:
-            with open("../data/channels.txt", "r", encoding="utf-8") as f:
-                channels = f.read().splitlines()
+            channels = await loop.run_in_executor(None, read_channels)
             logger.info(f"Loaded {len(channels)} channels from file.", extra={"category": ["stats", "message_stats"]})
         except Exception as e:
             logger.error(f"Failed to read channels.txt: %s\n%s", e, traceback.format_exc(), extra={"category": ["stats", "message_stats"]})
-            await interaction.response.send_message("Error reading channels data.", ephemeral=True)
+            await interaction.followup.send("Error reading channels data.", ephemeral=True)
             return
         
         try:
-            df_msg = pd.read_csv("../data/top_messages.csv")
-            df_words = pd.read_csv("../data/top_words.csv")
+            df_msg, df_words = await loop.run_in_executor(None, read_top_csvs)
             logger.info(f"Loaded message and word count CSV files.", extra={"category": ["stats", "message_stats"]})
         except Exception as e:
             logger.error(f"Failed to read CSV files: %s\n%s", e, traceback.format_exc(), extra={"category": ["stats", "message_stats"]})
-            await interaction.response.send_message("Error reading stats data.", ephemeral=True)
+            await interaction.followup.send("Error reading stats data.", ephemeral=True)
             return
 
-        # Create a horizontal bar chart of message counts
-        fig1 = go.Figure(data=go.Bar(
-            x=df_msg["Message Count"],
-            y=df_msg["Name"],
-            orientation='h',
-            text=df_msg["Message Count"],
-            marker=dict(color='#1985a1')
-        ))
-        fig1.update_layout(
-            title='Top 10 Message Senders',
-            xaxis_title='Total Messages',
-            yaxis_title='Name',
-            yaxis=dict(autorange='reversed', ticksuffix='  '),
-            plot_bgcolor='white',
-            title_x=0.5
+        # Both charts render in parallel on the chart renderer
+        png1, png2 = await asyncio.gather(
+            chart_png("message_count", df_msg, build_message_count),
+            chart_png("word_count", df_words, build_word_count)
         )
-        buf1 = BytesIO()
-        fig1.write_image(buf1, format="png")
-        buf1.seek(0)
-
-        # Create a horizontal bar chart of word counts
-        fig2 = go.Figure(data=go.Bar(
-            x=df_words["Word Count"],
-            y=df_words["Name"],
-            orientation='h',
-            text=df_words["Word Count"],
-            marker=dict(color='#284b63')
-        ))
-        fig2.update_layout(
-            title='Top 10 Users by Word Count',
-            xaxis_title='Total Words',
-            yaxis_title='Name',
-            yaxis=dict(autorange='reversed', ticksuffix='  '),
-            plot_bgcolor='white',
-            title_x=0.5
-        )
-        buf2 = BytesIO()
-        fig2.write_image(buf2, format="png")
-        buf2.seek(0)
+        buf1, buf2 = BytesIO(png1), BytesIO(png2)
 
         # Send channel list header and the images
         header = "**Scanned Channels:**\n" + "\n".join(f"- {c}" for c in channels)
@@ -175,58 +116,11 @@ class Stats(commands.Cog):
 
         log_slash_command(logger, interaction)
 
-        df_sessions = pd.read_csv('../data/all_bookings.csv')
-
-        today = datetime.now(SGT).date()
-        current_ay = today.year if today.month >= 4 else today.year - 1
-        df_sessions = df_sessions[df_sessions['AY'] == current_ay]
-
-        df_sessions['date'] = pd.to_datetime(df_sessions['date'])
-        grouped = df_sessions.groupby(['date', 'room']).size().reset_index(name='registrants')
-        pivot_df = grouped.pivot(index='date', columns='room', values='registrants').fillna(0)
-
-        label_colors = {
-            "PR9": "#102542",
-            "PR10": "#1f7a8c"
-        }
-
-        # Create line chart
-        fig = go.Figure()
-
-        for room in pivot_df.columns:
-            fig.add_trace(go.Scatter(
-                x=pivot_df.index,
-                y=pivot_df[room],
-                mode='lines+markers',
-                name=str(room),
-                line=dict(color=label_colors.get(room))
-            ))
-
-        fig.update_layout(
-            title=f"Trends in Room Registrations for AY{current_ay}",
-            xaxis_title="Month",
-            yaxis_title="Number of Registrants",
-            plot_bgcolor='white',
-            title_x=0.5,
-            xaxis=dict(
-                tickformat="%b",
-                dtick="M1",
-                showgrid=True,
-                gridcolor="lightgray",
-                griddash="dash",
-                ticklabelmode="period",
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridcolor="lightgray",
-                griddash="dot",
-                rangemode="tozero"
-            )
-        )
+        current_ay = get_academic_year(datetime.now(SGT).date())
+        df_rollups = await run_db(load_booking_rollups, ays=[current_ay])
 
-        buf = BytesIO()
-        fig.write_image(buf, format="png")
-        buf.seek(0)
+        data = {"ay": current_ay, "rollups": df_rollups}
+        buf = BytesIO(await chart_png("weekly_session_popularity", data, build_weekly_session_popularity))
 
         await interaction.followup.send(file=discord.File(buf, "weekly_session_trend.png"))
         await interaction.followup.send("Note: Updates daily at 5 PM SGT.")
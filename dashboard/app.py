@@ -1,7 +1,7 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 from utils.variables import SGT
+from data_loader import load_snapshot
 from graphs.weekly_session_popularity import weekly_session_popularity_chart
 from graphs.piano_groups import create_piano_group_pie_chart
 
@@ -31,16 +31,11 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Load data
-df_sessions = pd.read_csv('../data/all_bookings.csv')
-df_piano_groups = pd.read_csv('../data/piano_groups.csv')
-df_summary_numbers = pd.read_csv('../data/summary_numbers.csv')
-
-# Convert dates early for filtering
-df_sessions['date'] = pd.to_datetime(df_sessions['date'])
+# Load data from the latest published snapshot (cached until the version moves)
+data_version, df_rollups, df_piano_groups, df_summary_numbers = load_snapshot()
 
 # Get list of AYs from data
-available_ays = sorted(df_sessions['AY'].unique(), reverse=True)
+available_ays = sorted(df_rollups['AY'].unique(), reverse=True)
 
 # Sidebar filter: AY selector
 selected_ays = st.sidebar.multiselect(
@@ -58,8 +53,8 @@ else:
     members = alumni = new_members = 0
 
 # Sidebar filter — Date range
-min_date = df_sessions['date'].min().date()
-max_date = df_sessions['date'].max().date()
+min_date = df_rollups['date'].min().date()
+max_date = df_rollups['date'].max().date()
 
 start_date, end_date = st.sidebar.slider(
     "Select Date Range",
@@ -170,7 +165,7 @@ with col2:
     st.header("Weekly Sessions")
     tab1, tab2 = st.tabs(["Graph", "Description"])
     with tab1:
-        fig = weekly_session_popularity_chart(df_sessions, selected_ays, (start_date, end_date))
+        fig = weekly_session_popularity_chart(df_rollups, selected_ays, (start_date, end_date), data_version)
         st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
     with tab2:
         st.markdown("""
@@ -0,0 +1,176 @@
+import os
+import glob
+import duckdb
+import streamlit as st
+from datetime import datetime, time, timedelta
+from utils.message_archive import ARCHIVE_DIR, archive_updated_at
+
+
+# Message archive queries for the dashboard, run by DuckDB straight over the hive-partitioned
+# Parquet files (channel_id=<id>/month=<YYYY-MM>). Only the columns a query needs are read,
+# partitions outside the selected channels & months are never opened, and the timestamp filter
+# is pushed down to Parquet row groups. Events are resolved in SQL: the newest revision of each
+# message wins and deleted messages are dropped.
+ARCHIVE_GLOB = os.path.join(ARCHIVE_DIR, "*", "*", "*.parquet")
+SGT_OFFSET = timedelta(hours=8)
+
+# The legacy migration puts every channel it could not map under channel_id=0, so those are
+# told apart by name. A channel key is (channel_id, name) for those and (channel_id, None) otherwise.
+LEGACY_CHANNEL_ID = 0
+CHANNEL_KEY = f"CASE WHEN channel_id = {LEGACY_CHANNEL_ID} THEN channel END"
+
+
+@st.cache_resource
+def _connection():
+    conn = duckdb.connect()
+    conn.execute("SET TimeZone = 'UTC'")
+    return conn
+
+
+# Changes after each crawl & compaction, not on every live capture flush, so the caches below
+# (and the full scan behind channels()) last until the archive's daily refresh.
+# None when there is no archive yet; 0 for an archive written before the marker existed.
+def archive_version():
+    updated_at = archive_updated_at()
+    if updated_at is not None:
+        return updated_at
+    return 0 if glob.glob(ARCHIVE_GLOB) else None
+
+
+def _source():
+    return (
+        f"read_parquet('{ARCHIVE_GLOB}', hive_partitioning = true, union_by_name = true, "
+        "hive_types = {'channel_id': BIGINT, 'month': VARCHAR})"
+    )
+
+
+# Compaction deletes part files, so a query that expanded the glob just before can find one missing.
+# Retrying re-expands the glob against the compacted files.
+def _execute(sql):
+    try:
+        return _connection().cursor().execute(sql)
+    except duckdb.IOException:
+        return _connection().cursor().execute(sql)
+
+
+@st.cache_data(max_entries=1, show_spinner=False)
+def _schema(version):
+    rows = _execute(f"DESCRIBE SELECT * FROM {_source()}").fetchall()
+    return {name: column_type for name, column_type, *_ in rows}
+
+
+def _timestamp_literal(value, column_type):
+    # Naive archive timestamps are UTC, like discord.py's created_at
+    text = value.strftime("%Y-%m-%d %H:%M:%S")
+    return f"TIMESTAMPTZ '{text}+00'" if "TIME ZONE" in column_type else f"TIMESTAMP '{text}'"
+
+
+def _months(start_date, end_date):
+    months = []
+    month = start_date.replace(day=1)
+    while month <= end_date:
+        months.append(month.strftime("%Y-%m"))
+        month = (month + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def _channel_filter(channel_keys):
+    ids = [int(c) for c, name in channel_keys if name is None]
+    names = [name for c, name in channel_keys if name is not None]
+    clauses = []
+    if ids:
+        clauses.append(f"channel_id IN ({', '.join(str(c) for c in ids)})")
+    if names:
+        quoted = ", ".join("'" + name.replace("'", "''") + "'" for name in names)
+        clauses.append(f"(channel_id = {LEGACY_CHANNEL_ID} AND channel IN ({quoted}))")
+    return f"({' OR '.join(clauses)})"
+
+
+# Names shared by several channels get their ID appended, so each channel has its own label
+def _labelled(sql):
+    return f'''
+        SELECT * REPLACE (
+            CASE WHEN count(*) OVER (PARTITION BY channel) > 1
+                 THEN channel || CASE WHEN channel_id = {LEGACY_CHANNEL_ID} THEN ' (legacy)' ELSE ' (' || CAST(channel_id AS VARCHAR) || ')' END
+                 ELSE channel END AS channel
+        )
+        FROM ({sql})
+    '''
+
+
+# Resolved messages in the date range (SGT dates, inclusive) and channels, with only `columns` read
+def _messages_sql(version, start_date, end_date, channel_keys, columns):
+    schema = _schema(version)
+    start = datetime.combine(start_date, time.min) - SGT_OFFSET
+    end = datetime.combine(end_date + timedelta(days=1), time.min) - SGT_OFFSET
+
+    # A message's events all share its timestamp, so every filter here is safe before resolution
+    filters = [
+        f"month IN ({', '.join(repr(m) for m in _months(start.date(), end.date()))})",
+        f"timestamp >= {_timestamp_literal(start, schema['timestamp'])}",
+        f"timestamp < {_timestamp_literal(end, schema['timestamp'])}",
+    ]
+    if channel_keys:
+        filters.append(_channel_filter(channel_keys))
+
+    # Parts written before live capture have no event/revision columns
+    event = "coalesce(event, 'create')" if "event" in schema else "'create'"
+    revision = "coalesce(revision, 0)" if "revision" in schema else "0"
+    selected = ", ".join(dict.fromkeys(["message_id", "channel_id", *columns]))
+
+    return f'''
+        SELECT {selected} FROM (
+            SELECT {selected}, {event} AS event
+            FROM {_source()}
+            WHERE {" AND ".join(filters)}
+            QUALIFY row_number() OVER (PARTITION BY channel_id, message_id ORDER BY {revision} DESC) = 1
+        )
+        WHERE event <> 'delete'
+    '''
+
+
+def _query(sql):
+    return _execute(sql).df()
+
+
+@st.cache_data(max_entries=1, show_spinner=False)
+def channels(version):
+    return _query(_labelled(f'''
+        SELECT channel_id, {CHANNEL_KEY} AS legacy_channel, arg_max(channel, timestamp) AS channel
+        FROM {_source()} WHERE channel <> '' GROUP BY channel_id, legacy_channel
+    ''') + " ORDER BY channel")
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def daily_activity(version, start_date, end_date, channel_keys):
+    messages = _messages_sql(version, start_date, end_date, channel_keys, ["timestamp"])
+    return _query(f'''
+        SELECT CAST(timestamp + INTERVAL 8 HOUR AS DATE) AS date, count(*) AS messages
+        FROM ({messages}) GROUP BY date ORDER BY date
+    ''')
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def channel_breakdown(version, start_date, end_date, channel_keys):
+    messages = _messages_sql(version, start_date, end_date, channel_keys, ["channel", "timestamp"])
+    return _query(_labelled(f'''
+        SELECT channel_id, arg_max(channel, timestamp) AS channel, count(*) AS messages
+        FROM ({messages}) GROUP BY channel_id, {CHANNEL_KEY}
+    ''') + " ORDER BY messages DESC")
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def author_breakdown(version, start_date, end_date, channel_keys, limit=20):
+    messages = _messages_sql(version, start_date, end_date, channel_keys, ["author", "content"])
+    return _query(f'''
+        SELECT author, count(*) AS messages,
+               sum(CASE WHEN trim(content) = '' THEN 0 ELSE len(string_split_regex(trim(content), '\\s+')) END) AS words
+        FROM ({messages}) WHERE author <> '' GROUP BY author ORDER BY messages DESC LIMIT {int(limit)}
+    ''')
+
+
+# First & last SGT dates in the archive
+@st.cache_data(max_entries=1, show_spinner=False)
+def date_bounds(version):
+    first, last = _execute(f"SELECT min(timestamp), max(timestamp) FROM {_source()}").fetchone()
+    return (first.replace(tzinfo=None) + SGT_OFFSET).date(), (last.replace(tzinfo=None) + SGT_OFFSET).date()
@@ -0,0 +1,47 @@
+import streamlit as st
+import pandas as pd
+from utils.snapshot import read_manifest, snapshot_path
+
+
+# Streamlit reruns app.py on every interaction. Each rerun only reads the bot's small snapshot
+# manifest; frames are parsed once per published version and kept in st.cache_data across reruns
+# & sessions. All frames come from the same version, so a page never mixes two refreshes.
+
+
+def current_manifest():
+    manifest = read_manifest()
+    if manifest is None:
+        st.error("No data has been published yet. The bot publishes one when it starts and after its daily refresh.")
+        st.stop()
+    return manifest
+
+
+def _read(manifest, name):
+    return pd.read_parquet(snapshot_path(manifest, name))
+
+
+# The manifest is hashed into the cache key, so a new version loads fresh frames
+@st.cache_data(max_entries=1, show_spinner=False)
+def _booking_rollups(manifest):
+    df = _read(manifest, "booking_rollups")
+    df['date'] = pd.to_datetime(df['date'])
+    df['AY'] = df['AY'].astype(int)
+    df['registrants'] = df['registrants'].astype(int)
+    return df
+
+
+@st.cache_data(max_entries=1, show_spinner=False)
+def _piano_groups(manifest):
+    return _read(manifest, "piano_groups")
+
+
+@st.cache_data(max_entries=1, show_spinner=False)
+def _summary_numbers(manifest):
+    df = _read(manifest, "summary_numbers")
+    df['AY'] = df['AY'].astype(int)
+    return df
+
+
+def load_snapshot():
+    manifest = current_manifest()
+    return manifest["version"], _booking_rollups(manifest), _piano_groups(manifest), _summary_numbers(manifest)
@@ -1,28 +1,33 @@
+import json
 import plotly.graph_objects as go
 import pandas as pd
+import streamlit as st
 
 
-def weekly_session_popularity_chart(df_sessions, selected_ays, date_range):
+label_colors = {
+    "PR9": "#102542",
+    "PR10": "#1f7a8c"
+}
 
-    # Convert dates
-    df_sessions = df_sessions[df_sessions['AY'].isin(selected_ays)]
-    df_sessions['date'] = pd.to_datetime(df_sessions['date'])
 
-    # Filter by selected date range
-    start_date, end_date = date_range
-    mask = (df_sessions['date'] >= start_date) & (df_sessions['date'] <= end_date)
-    df_filtered = df_sessions[mask]
+# Registrants per date (rows) & room (columns) for one AY selection, built once per data version.
+# The leading underscore keeps Streamlit from hashing the frame; version identifies it instead.
+@st.cache_data(max_entries=16, show_spinner=False)
+def ay_pivot(_df_rollups, version, selected_ays):
+    df = _df_rollups[_df_rollups['AY'].isin(selected_ays)]
+    pivot_df = df.pivot(index='date', columns='room', values='registrants').fillna(0)
+    return pivot_df.sort_index()
 
-    # Group and pivot
-    grouped = df_filtered.groupby(['date', 'room']).size().reset_index(name='registrants')
-    pivot_df = grouped.pivot(index='date', columns='room', values='registrants').fillna(0)
 
-    end_month_last_day = pd.to_datetime(end_date).replace(day=1) + pd.offsets.MonthEnd(0)
+# Figure JSON per (version, AYs, date range); least recently used entries are evicted
+@st.cache_data(max_entries=64, show_spinner=False)
+def _chart_json(_df_rollups, version, selected_ays, start_date, end_date):
+    # Date range is a slice of the sorted date index
+    pivot_df = ay_pivot(_df_rollups, version, selected_ays)
+    if not pivot_df.empty:
+        pivot_df = pivot_df.loc[start_date:end_date]
 
-    label_colors = {
-        "PR9": "#102542",
-        "PR10": "#1f7a8c"
-    }
+    end_month_last_day = pd.to_datetime(end_date).replace(day=1) + pd.offsets.MonthEnd(0)
 
     fig = go.Figure()
 
@@ -74,4 +79,11 @@ def weekly_session_popularity_chart(df_sessions, selected_ays, date_range):
             rangemode="tozero",
         )
     )
-    return fig
\ No newline at end of file
+    return fig.to_json()
+
+
+# df_rollups: booking_rollups rows (registrants per date & room) with parsed dates.
+# version: snapshot version of df_rollups, used as its cache key.
+def weekly_session_popularity_chart(df_rollups, selected_ays, date_range, version):
+    start_date, end_date = date_range
+    return json.loads(_chart_json(df_rollups, version, tuple(sorted(selected_ays)), start_date, end_date))
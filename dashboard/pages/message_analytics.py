@@ -0,0 +1,87 @@
+import streamlit as st
+import pandas as pd
+from datetime import date
+import plotly.graph_objects as go
+from archive_queries import archive_version, author_breakdown, channel_breakdown, channels, daily_activity, date_bounds
+
+
+st.set_page_config(
+    page_title="Message Analytics",
+    page_icon="images/piano_ensemble_logo.png"
+)
+
+version = archive_version()
+if version is None:
+    st.info("The message archive is empty. It fills after the bot's first daily collection.")
+    st.stop()
+
+# Sidebar filters
+min_date, max_date = date_bounds(version)
+ay_start = date(max_date.year if max_date.month >= 4 else max_date.year - 1, 4, 1)  # Default to the current AY
+start_date, end_date = st.sidebar.slider(
+    "Select Date Range",
+    value=(max(min_date, ay_start), max_date),
+    format="YYYY-MM-DD",
+    min_value=min_date,
+    max_value=max_date
+)
+
+# Channels are keyed by ID (and name, for legacy channels without one), not by their label
+df_channels = channels(version)
+channel_labels = {
+    (int(row.channel_id), None if pd.isna(row.legacy_channel) else row.legacy_channel): row.channel
+    for row in df_channels.itertuples(index=False)
+}
+selected_channels = st.sidebar.multiselect(
+    "Select Channel(s)",
+    options=list(channel_labels),
+    format_func=channel_labels.get,
+    placeholder="All channels"
+)
+channel_keys = tuple(sorted(selected_channels, key=lambda k: (k[0], k[1] or "")))
+
+
+st.header("Message Activity")
+df_daily = daily_activity(version, start_date, end_date, channel_keys)
+
+card1, card2 = st.columns(2)
+card1.metric("Messages", f"{int(df_daily['messages'].sum()):,}")
+card2.metric("Active Days", f"{len(df_daily):,}")
+
+fig = go.Figure(go.Scatter(
+    x=df_daily['date'],
+    y=df_daily['messages'],
+    mode='lines',
+    line=dict(color='#1985a1'),
+    hovertemplate='Date: %{x|%Y-%m-%d}<br>Messages: %{y}<extra></extra>'
+))
+fig.update_layout(title="Messages per Day", title_x=0, plot_bgcolor='white', dragmode=False,
+                  xaxis=dict(fixedrange=True, showgrid=True, gridcolor="lightgray", griddash="dash"),
+                  yaxis=dict(fixedrange=True, showgrid=True, gridcolor="lightgray", griddash="dot", rangemode="tozero"))
+st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+
+
+col1, spacer, col2 = st.columns([1, 0.005, 1])
+
+with col1:
+    st.header("By Channel")
+    df_by_channel = channel_breakdown(version, start_date, end_date, channel_keys)
+    fig = go.Figure(go.Bar(
+        x=df_by_channel['messages'],
+        y=df_by_channel['channel'],
+        orientation='h',
+        marker=dict(color='#284b63'),
+        hovertemplate='%{y}: %{x} messages<extra></extra>'
+    ))
+    fig.update_layout(plot_bgcolor='white', dragmode=False, height=max(300, 28 * len(df_by_channel)),
+                      yaxis=dict(autorange='reversed', ticksuffix='  ', fixedrange=True), xaxis=dict(fixedrange=True))
+    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+
+with col2:
+    st.header("Top Authors")
+    df_by_author = author_breakdown(version, start_date, end_date, channel_keys)
+    st.dataframe(
+        df_by_author.rename(columns={"author": "Name", "messages": "Messages", "words": "Words"}),
+        hide_index=True,
+        use_container_width=True
+    )
@@ -8,12 +8,23 @@ cursor.execute("DROP TABLE IF EXISTS users;")
 cursor.execute("DROP TABLE IF EXISTS all_bookings;")
 cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'all_bookings';")
 
+cursor.execute("DROP TABLE IF EXISTS booking_rollups;")
+
+cursor.execute("DROP TABLE IF EXISTS booking_slot_rollups;")
+
 cursor.execute("DROP TABLE IF EXISTS member_piano_groups;")
 cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'member_piano_groups';")
 
 cursor.execute("DROP TABLE IF EXISTS summary_numbers;")
 cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'summary_numbers';")
 
+cursor.execute("DROP TABLE IF EXISTS links;")
+
+cursor.execute("DROP TABLE IF EXISTS composers;")
+
+cursor.execute("DROP TABLE IF EXISTS job_runs;")
+cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'job_runs';")
+
 conn.commit()
 
 conn.close()
\ No newline at end of file
@@ -1,46 +1,11 @@
-import sqlite3
+import os
+import sys
 
-conn = sqlite3.connect('../databases/pe_helper.db')
-cursor = conn.cursor()
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
 
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS users (
-    discord_id VARCHAR(32) PRIMARY KEY,
-    admin_number VARCHAR(7) UNIQUE,
-    name VARCHAR(100),
-    access_token TEXT NOT NULL,
-    refresh_token TEXT,
-    token_expiry TIMESTAMP
-);
-''')
+from utils.database import connect, init_schema
 
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS all_bookings (
-    booking_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    date DATE NOT NULL,
-    room VARCHAR(50) NOT NULL,
-    time_slot VARCHAR(50) NOT NULL,
-    admin_num VARCHAR(7),
-    AY VARCHAR(4) NOT NULL
-);
-''')
 
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS member_piano_groups (
-    member_piano_groups_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    Advanced INTEGER NOT NULL,
-    Intermediate INTEGER NOT NULL,
-    Novice INTEGER NOT NULL,
-    Foundational INTEGER NOT NULL
-)
-''')
-
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS summary_numbers (
-    summary_numbers_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    AY VARCHAR(4) NOT NULL,
-    members_num INTEGER NOT NULL,
-    alumni_num INTEGER NOT NULL,
-    new_members_num INTEGER NOT NULL
-);
-''')
\ No newline at end of file
+conn = connect()
+init_schema(conn)
+conn.close()
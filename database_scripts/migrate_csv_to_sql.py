@@ -0,0 +1,69 @@
+import os
+import sys
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from utils.database import (
+    connect, init_schema, replace_session, save_links, save_piano_groups, replace_summary_numbers, PIANO_GROUPS
+)
+from utils.link_lifecycle import ensure_lifecycle_columns
+from utils.snapshot import publish_snapshot
+
+
+# One-shot import of the CSV files the bot used to keep under ../data into pe_helper.db.
+# Safe to re-run: sessions, links and summaries are replaced, composer counts are overwritten.
+DATA_DIR = "../data"
+
+
+def data_file(name):
+    path = os.path.join(DATA_DIR, name)
+    return path if os.path.exists(path) else None
+
+
+conn = connect()
+
+# Earlier schema had no name column and a text AY; it only ever held CSV copies, so rebuild it
+columns = [row[1] for row in conn.execute("PRAGMA table_info(all_bookings)")]
+if columns and "name" not in columns:
+    conn.execute("DROP TABLE all_bookings;")
+    conn.commit()
+
+init_schema(conn)
+
+if path := data_file("all_bookings.csv"):
+    df = pd.read_csv(path)
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    for (date, room), df_session in df.groupby(["date", "room"], sort=False):
+        replace_session(conn, date, room, df_session[["date", "room", "time_slot", "name", "admin_num", "AY"]])
+    print(f"all_bookings: {len(df)} rows")
+
+if path := data_file("piano_groups.csv"):
+    df = pd.read_csv(path)
+    for row in df[PIANO_GROUPS].to_dict("records"):
+        save_piano_groups(conn, row)
+    print(f"member_piano_groups: {len(df)} rows")
+
+if path := data_file("summary_numbers.csv"):
+    df = pd.read_csv(path)
+    replace_summary_numbers(conn, df)
+    print(f"summary_numbers: {len(df)} rows")
+
+if path := data_file("links.csv"):
+    df = ensure_lifecycle_columns(pd.read_csv(path))
+    save_links(conn, df[["url", "scanned", "state", "session_date", "last_scraped"]])
+    print(f"links: {len(df)} rows")
+
+if path := data_file("composers.csv"):
+    df = pd.read_csv(path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO composers (composer, searches) VALUES (?, ?) ON CONFLICT(composer) DO UPDATE SET searches = excluded.searches",
+            [(row.Composers, int(row.Searches)) for row in df.itertuples(index=False)]
+        )
+    print(f"composers: {len(df)} rows")
+
+# Publish right away so the dashboard has data before the bot's next daily refresh
+print(f"snapshot: {publish_snapshot(conn)} rows")
+
+conn.close()
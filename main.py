@@ -5,7 +5,11 @@ import os
 import logging
 from utils.discord_handler import DiscordHandler
 from utils.setup_logger import setup_logging
+from utils.async_db import shutdown_db
+from utils.chart_renderer import shutdown_renderer
 import traceback
+import time
+from utils.variables import START_TIME
 
 
 load_dotenv()
@@ -20,11 +24,16 @@ intents.messages = True
 intents.message_content = True
 
 class PEHelper(commands.Bot):
+    # Seconds from process start to the first on_ready; None until then
+    time_to_ready = None
+
     async def setup_hook(self):
         extensions = [
             "cogs.admin",
             "cogs.members",
             "cogs.stats",
+            "cogs.message_capture",
+            "cogs.roster",
             "cogs.background_tasks",
             "cogs.score_searcher",
             "cogs.sheet_retriever",
@@ -41,11 +50,13 @@ class PEHelper(commands.Bot):
                 logger.error(f"Failed to load {extension}: {e}")
                 logger.error(traceback.format_exc())
 
+    async def close(self):
+        await super().close()
+        shutdown_db()
+        shutdown_renderer()
 
-bot = PEHelper(command_prefix="!", intents=intents, application_id=APP_ID)
 
-# Initialize logging before anything else
-setup_logging()
+bot = PEHelper(command_prefix="!", intents=intents, application_id=APP_ID)
 
 # Get logger
 logger = logging.getLogger("pe_helper")
@@ -53,7 +64,13 @@ logger = logging.getLogger("pe_helper")
 
 @bot.event
 async def on_ready():
-    logger.info(f"Logged in as {bot.user}", extra={"category": "on_ready"})
+    # on_ready fires again after every reconnect; the one-time setup below must not be repeated
+    if bot.time_to_ready is not None:
+        logger.info(f"Reconnected as {bot.user}, skipping startup.", extra={"category": "on_ready"})
+        return
+    bot.time_to_ready = time.time() - START_TIME
+
+    logger.info(f"Logged in as {bot.user} ({bot.time_to_ready:.1f}s after start)", extra={"category": "on_ready"})
     guild = discord.utils.get(bot.guilds, name="NYP Piano Ensemble")
     if guild:
         try:
@@ -113,4 +130,9 @@ async def on_message(message):
         return
 
 
-bot.run(TOKEN)
\ No newline at end of file
+# Guarded so spawned chart renderer workers can import this module without starting the bot
+# or opening the log files
+if __name__ == "__main__":
+    # Initialize logging before anything else
+    setup_logging()
+    bot.run(TOKEN)
@@ -0,0 +1,43 @@
+import os
+import asyncio
+import logging
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from utils.database import get_connection
+
+
+# Database work runs on its own small thread pool so queries never block the event loop
+# (gateway heartbeats, other users' interactions). Each I/O thread keeps one long-lived
+# connection from get_connection(), and sqlite3 caches the prepared statement for every
+# query text on that connection, so repeated queries skip re-parsing.
+DB_IO_THREADS = int(os.getenv("DB_IO_THREADS", "2"))
+
+logger = logging.getLogger("pe_helper")
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=DB_IO_THREADS, thread_name_prefix="pe_helper_db")
+    return _executor
+
+
+def _call(func, args, kwargs):
+    return func(get_connection(), *args, **kwargs)
+
+
+# Runs func(conn, *args, **kwargs) on a database I/O thread and returns its result.
+# func receives that thread's connection and must not hand it to another thread.
+async def run_db(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), partial(_call, func, args, kwargs))
+
+
+def shutdown_db():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+        logger.info("Database I/O threads stopped.", extra={"category": ["async_db", "shutdown_db"]})
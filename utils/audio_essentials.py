@@ -1,9 +1,12 @@
 import yt_dlp
 import re
 import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import googleapiclient.discovery
 import discord
+from youtubesearchpython import VideosSearch
 from utils.variables import currently_playing, audio
 import logging
 import platform
@@ -19,10 +22,23 @@ if os_type == "Windows":
 elif os_type == "Linux":
     FFMPEG_PATH = os.getenv('FFMPEG_PATH_VPS')
 
+# Downloads run on a bounded pool so a slow download never blocks the event loop or voice
+MUSIC_DOWNLOAD_WORKERS = int(os.getenv("MUSIC_DOWNLOAD_WORKERS", "2"))
+
+# Queue entry states: entries are queued as pending and only ready ones are played
+STATUS_PENDING = "pending"
+STATUS_DOWNLOADING = "downloading"
+STATUS_READY = "ready"
+
 logger = logging.getLogger("pe_helper")
 
 
 video_queue = []
+_download_pool = ThreadPoolExecutor(max_workers=MUSIC_DOWNLOAD_WORKERS, thread_name_prefix="music_download")
+
+
+class VideoTooLong(Exception):
+    pass
 
 valid_links = ['youtube.com', 'youtu.be']
 regexs = [re.compile(i) for i in valid_links]
@@ -36,7 +52,7 @@ def create_directory(name):
     return
 
 
-def get_audio(url):
+def get_audio(url, progress_hook=None):
     try:
         create_directory("audios")
         logger.info(f"Downloading audio from URL: {url}")
@@ -49,6 +65,8 @@ def get_audio(url):
             'no_warnings': True,
             'cookiefile': 'auth/cookies.txt',
         }
+        if progress_hook:
+            ydl_opts['progress_hooks'] = [progress_hook]
 
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             info_dict = ydl.extract_info(url, download=True)
@@ -92,6 +110,56 @@ def check_video_length(VidID):
         return False
 
 
+def new_queue_entry(search):
+    return {'search': search, 'title': search, 'displayTitle': search, 'link': None, 'id': None,
+            'path': None, 'duration': None, 'status': STATUS_PENDING, 'progress': 0}
+
+
+# Looks up the video for a search term or YouTube link (blocking; run off the event loop)
+def resolve_video(search):
+    if not any([regex.search(search) for regex in regexs]):
+        video_search = VideosSearch(search, limit=1)
+        video = video_search.result()['result'][0]
+        video_id = video["id"]
+        if not check_video_length(video_id):
+            raise VideoTooLong(video['title'])
+        return {'title': video['title'], 'link': video['link'], 'id': video_id,
+                'duration': video['duration'], 'displayTitle': video['title']}
+
+    video_id = get_id(search)
+    youtube = googleapiclient.discovery.build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+    request = youtube.videos().list(part="snippet, contentDetails", id=video_id)
+    response = request.execute()
+    title = response['items'][0]['snippet']['title']
+    duration = response['items'][0]['contentDetails']['duration']
+    return {'title': title, 'link': search, 'id': video_id, 'duration': duration, 'displayTitle': title}
+
+
+# Resolves and downloads a queued entry in the background, updating its status & progress in place
+async def prepare_entry(entry):
+    loop = asyncio.get_running_loop()
+    entry.update(await loop.run_in_executor(None, resolve_video, entry['search']))
+    entry['status'] = STATUS_DOWNLOADING
+
+    def progress_hook(d):
+        total = d.get('total_bytes') or d.get('total_bytes_estimate')
+        if d.get('status') == 'downloading' and total:
+            entry['progress'] = int(d.get('downloaded_bytes', 0) * 100 / total)
+
+    entry['path'] = await loop.run_in_executor(_download_pool, get_audio, entry['link'], progress_hook)
+    entry['progress'] = 100
+    entry['status'] = STATUS_READY
+    return entry
+
+
+def describe_status(entry):
+    if entry.get('status') == STATUS_PENDING:
+        return "⏳ Looking up"
+    if entry.get('status') == STATUS_DOWNLOADING:
+        return f"⬇️ Downloading {entry.get('progress', 0)}%"
+    return "✅ Ready"
+
+
 def refresh_song(client, set_guild):
     global currently_playing
     global audio
@@ -106,8 +174,13 @@ def refresh_song(client, set_guild):
             logger.debug("Voice client is already playing")
             return
 
-        if not video_queue:
-            logger.info("No songs left in queue")
+        # Play the first track that has finished downloading; pending ones are picked up when ready
+        next_song = next((song for song in video_queue if song['status'] == STATUS_READY), None)
+        if next_song is None:
+            if video_queue:
+                logger.info(f"No downloaded songs yet, {len(video_queue)} still pending")
+            else:
+                logger.info("No songs left in queue")
             currently_playing.clear()
             return
         
@@ -119,8 +192,8 @@ def refresh_song(client, set_guild):
             except Exception as e:
                 logger.warning(f"Error deleting previous audio file: %s\n%s", e, traceback.format_exc(), extra={"category": ["music_bot", "refresh_song"]})
 
-        # Pop next song before playing
-        next_song = video_queue.pop(0)
+        # Take next song off the queue before playing
+        video_queue.remove(next_song)
         currently_playing.clear()
         currently_playing.update(next_song)
         currently_playing['displayTitle'] = f"Currently Playing: {next_song['title']}"
@@ -0,0 +1,36 @@
+import pandas as pd
+from datetime import datetime
+from utils.database import replace_session
+
+
+BOOKINGS_COLUMNS = ["date", "room", "time_slot", "name", "admin_num", "AY"]
+ADMIN_NUM_PATTERN = r'(\b\d{6}[A-Za-z]\b)'
+
+
+# AY runs from April 1st to March 31st
+def get_academic_year(date):
+    ay_start = datetime(date.year, 4, 1).date()
+    if date >= ay_start:
+        return date.year
+    else:
+        return date.year - 1
+
+
+def normalize_admin_nums(admin_nums):
+    return admin_nums.astype("string").str.extract(ADMIN_NUM_PATTERN)[0].str.upper()
+
+
+# Bookings repository on the all_bookings table, indexed on (date, room, time_slot).
+# Replacing a session only touches that session's rows, and only new rows are normalised.
+class BookingsStore:
+    def __init__(self, conn):
+        self.conn = conn
+
+
+    def replace_session(self, date, room, bookings):
+        df_new = pd.DataFrame(bookings, columns=BOOKINGS_COLUMNS[:-1])
+        df_new["admin_num"] = normalize_admin_nums(df_new["admin_num"])
+        df_new["AY"] = get_academic_year(date)
+        df_new = df_new.sort_values("time_slot", kind="stable").reset_index(drop=True)
+        replace_session(self.conn, date, room, df_new)
+        return df_new
@@ -0,0 +1,42 @@
+import os
+import time
+import asyncio
+import logging
+import traceback
+
+
+# Max number of channel histories read at once. discord.py already queues requests per
+# rate-limit bucket (history buckets are keyed per channel) and sleeps on 429s, so this only
+# bounds how many buckets are in flight together.
+CHANNEL_FETCH_CONCURRENCY = int(os.getenv("CHANNEL_FETCH_CONCURRENCY", "4"))
+
+logger = logging.getLogger("pe_helper")
+
+
+# Runs handler(channel) for every channel, at most `concurrency` at a time.
+# Returns results in the same order as `channels`; a handler that raises yields None.
+async def fetch_channels(channels, handler, concurrency=None, category="channel_fetcher"):
+    channels = list(channels)
+    semaphore = asyncio.Semaphore(concurrency or CHANNEL_FETCH_CONCURRENCY)
+    total = len(channels)
+    completed = 0
+    started = time.perf_counter()
+
+    async def run(channel):
+        nonlocal completed
+        async with semaphore:
+            channel_started = time.perf_counter()
+            try:
+                result = await handler(channel)
+            except Exception as e:
+                logger.error(f"Error fetching channel {channel.name}: %s\n%s", e, traceback.format_exc(), extra={"category": [category, "fetch_channels"]})
+                result = None
+
+            completed += 1
+            elapsed = time.perf_counter() - channel_started
+            logger.info(f"[{completed}/{total}] Finished channel '{channel.name}' in {elapsed:.2f}s", extra={"category": [category, "fetch_channels"]})
+            return result
+
+    results = await asyncio.gather(*(run(channel) for channel in channels))
+    logger.info(f"Fetched {total} channels in {time.perf_counter() - started:.2f}s", extra={"category": [category, "fetch_channels"]})
+    return results
@@ -1,8 +1,13 @@
 import os
 import json
+import threading
 
 
 TRACKER_FILE = "../data/last_seen_ids.json"
+LINKS_TRACKER_FILE = "../data/links_last_seen_id.json"
+
+# The crawl updates cursors on the event loop while live capture flushes from executor threads
+_tracker_lock = threading.Lock()
 
 
 def load_last_seen_ids():
@@ -13,5 +18,34 @@ def load_last_seen_ids():
 
 
 def save_last_seen_ids(last_seen_ids):
-	with open(TRACKER_FILE, "w") as f:
-		json.dump(last_seen_ids, f)
\ No newline at end of file
+	# Unique per thread, so two writers never share a half-written temp file
+	tmp_file = f"{TRACKER_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+	with open(tmp_file, "w") as f:
+		json.dump(last_seen_ids, f)
+	os.replace(tmp_file, TRACKER_FILE)
+
+
+# Advance a single channel's cursor, never moving it backwards.
+# Reloads the file under a lock so concurrent writers (crawl & live capture) don't clobber each other.
+def update_last_seen_id(channel_id, message_id):
+	with _tracker_lock:
+		last_seen_ids = load_last_seen_ids()
+		if message_id > last_seen_ids.get(str(channel_id), 0):
+			last_seen_ids[str(channel_id)] = message_id
+			save_last_seen_ids(last_seen_ids)
+
+
+# Cursor for SignUpGenius link discovery in the weekly-sessions channel, kept apart
+# from the archive cursors so each can be reset independently.
+def load_links_last_seen_id():
+	if not os.path.exists(LINKS_TRACKER_FILE):
+		return None
+	with open(LINKS_TRACKER_FILE, "r") as f:
+		return json.load(f).get("last_seen_id")
+
+
+def save_links_last_seen_id(last_seen_id):
+	tmp_file = f"{LINKS_TRACKER_FILE}.tmp"
+	with open(tmp_file, "w") as f:
+		json.dump({"last_seen_id": last_seen_id}, f)
+	os.replace(tmp_file, LINKS_TRACKER_FILE)
\ No newline at end of file
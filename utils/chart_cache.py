@@ -0,0 +1,82 @@
+import os
+import glob
+import json
+import asyncio
+import hashlib
+import logging
+import pandas as pd
+from utils.chart_renderer import CHART_RENDERER, render_figure
+
+
+# Rendered chart PNGs, keyed by chart name and a hash of the chart's input data.
+# A chart is only rendered when its data changes; the superseded PNG is then evicted.
+CHART_CACHE_DIR = "../data/charts"
+
+logger = logging.getLogger("pe_helper")
+
+_memory = {}  # name -> (key, png bytes) for the current entry of each chart
+
+
+def _hash_into(h, value):
+    if isinstance(value, pd.DataFrame):
+        h.update(json.dumps(list(map(str, value.columns))).encode())
+        h.update(pd.util.hash_pandas_object(value, index=False).values.tobytes())
+    elif isinstance(value, dict):
+        for k in sorted(value):
+            h.update(str(k).encode())
+            _hash_into(h, value[k])
+    else:
+        h.update(json.dumps(value, sort_keys=True, default=str).encode())
+
+
+def data_key(data):
+    h = hashlib.sha256(CHART_RENDERER.encode())  # Switching renderer re-renders every chart
+    _hash_into(h, data)
+    return h.hexdigest()[:16]
+
+
+def _path(name, key):
+    return os.path.join(CHART_CACHE_DIR, f"{name}-{key}.png")
+
+
+def _evict_superseded(name, key):
+    current = _path(name, key)
+    for path in glob.glob(os.path.join(CHART_CACHE_DIR, f"{name}-*.png")):
+        if path != current:
+            os.remove(path)
+
+
+# File reads & writes below run in the executor; only the in-memory lookup happens on the event loop
+def _read_png(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _write_png(name, key, png):
+    os.makedirs(CHART_CACHE_DIR, exist_ok=True)
+    path = _path(name, key)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(png)
+    os.replace(tmp_path, path)
+    _evict_superseded(name, key)
+
+
+# Returns the chart's PNG, rendering (and caching) it only if its data changed since the last render
+async def chart_png(name, data, build):
+    key = data_key(data)
+    entry = _memory.get(name)
+    if entry and entry[0] == key:
+        return entry[1]
+
+    loop = asyncio.get_running_loop()
+    png = await loop.run_in_executor(None, _read_png, _path(name, key))
+    if png is None:
+        png = await render_figure(build(data))
+        await loop.run_in_executor(None, _write_png, name, key, png)
+        logger.info(f"Rendered chart {name} ({len(png)} bytes).", extra={"category": ["chart_cache", "chart_png"]})
+
+    _memory[name] = (key, png)
+    return png
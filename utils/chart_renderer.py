@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+# Chart exports run in a pool of long-lived worker processes. Kaleido keeps one Chromium
+# subprocess per Python process, so each worker starts it once (warm-up) and reuses it for
+# every render, and the event loop only awaits the PNG bytes.
+#
+# CHART_RENDERER=native draws the charts with Pillow instead (utils/native_charts.py): no Chromium,
+# rendered on a thread, and figures it cannot draw still go to Kaleido.
+CHART_RENDERER = os.getenv("CHART_RENDERER", "kaleido")
+CHART_RENDER_WORKERS = int(os.getenv("CHART_RENDER_WORKERS", "2"))
+CHART_RENDER_TIMEOUT = int(os.getenv("CHART_RENDER_TIMEOUT", "60"))
+
+logger = logging.getLogger("pe_helper")
+
+_pool = None
+_metrics = {"queued": 0, "rendered": 0, "failed": 0, "timeouts": 0, "render_seconds": 0.0}
+
+
+def _warm_up():
+    import plotly.io as pio
+    import plotly.graph_objects as go
+    pio.to_image(go.Figure(), format="png")
+
+
+def _render(fig_json):
+    import plotly.io as pio
+    return pio.to_image(pio.from_json(fig_json), format="png")
+
+
+def _render_native(fig_json):
+    from utils.native_charts import render_native
+    return render_native(json.loads(fig_json))
+
+
+def _native_supported(fig_json):
+    from utils.native_charts import is_supported
+    return is_supported(json.loads(fig_json))
+
+
+# Spawned rather than forked: the bot process already runs DB, scraper and default executor threads,
+# and forking a threaded process can copy a held lock into the child (main.py guards bot.run)
+_CONTEXT = multiprocessing.get_context("spawn")
+
+
+# One single-process executor per worker, so a hung render can be recycled without touching the others
+class _Worker:
+    def __init__(self):
+        self.executor = ProcessPoolExecutor(max_workers=1, mp_context=_CONTEXT, initializer=_warm_up)
+
+
+    def terminate(self):
+        for process in list(getattr(self.executor, "_processes", {}).values()):
+            process.terminate()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Idle workers; a render waits here for a free worker before its timeout starts
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = asyncio.Queue()
+        for _ in range(CHART_RENDER_WORKERS):
+            _pool.put_nowait(_Worker())
+        logger.info(f"Started chart renderer with {CHART_RENDER_WORKERS} workers.", extra={"category": ["chart_renderer", "start"]})
+    return _pool
+
+
+def _replace_worker(worker):
+    worker.terminate()
+    logger.warning("Chart renderer worker restarted.", extra={"category": ["chart_renderer", "restart"]})
+    return _Worker()
+
+
+async def _render_on_worker(fig_json, timeout):
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    worker = await pool.get()
+    try:
+        return await asyncio.wait_for(loop.run_in_executor(worker.executor, _render, fig_json), timeout)
+    except (asyncio.TimeoutError, BrokenProcessPool):
+        # Only this worker's Chromium may be wedged (or its process died)
+        worker = _replace_worker(worker)
+        raise
+    finally:
+        pool.put_nowait(worker)
+
+
+async def render_figure(fig, timeout=None):
+    loop = asyncio.get_running_loop()
+    fig_json = fig.to_json()
+    timeout = timeout or CHART_RENDER_TIMEOUT
+
+    _metrics["queued"] += 1
+    if _metrics["queued"] > CHART_RENDER_WORKERS:
+        logger.info(f"Chart render queued behind {_metrics['queued'] - 1} others.", extra={"category": ["chart_renderer", "render_figure"]})
+
+    started = time.perf_counter()
+    try:
+        if CHART_RENDERER == "native" and _native_supported(fig_json):
+            png = await asyncio.wait_for(loop.run_in_executor(None, _render_native, fig_json), timeout)
+        else:
+            png = await _render_on_worker(fig_json, timeout)
+    except asyncio.TimeoutError:
+        _metrics["timeouts"] += 1
+        raise
+    except Exception:
+        _metrics["failed"] += 1
+        raise
+    finally:
+        _metrics["queued"] -= 1
+
+    _metrics["rendered"] += 1
+    _metrics["render_seconds"] += time.perf_counter() - started
+    return png
+
+
+def renderer_metrics():
+    rendered = _metrics["rendered"]
+    return {
+        "backend": CHART_RENDERER,
+        "workers": CHART_RENDER_WORKERS if _pool is not None else 0,
+        "queue_depth": _metrics["queued"],
+        "rendered": rendered,
+        "failed": _metrics["failed"],
+        "timeouts": _metrics["timeouts"],
+        "avg_seconds": _metrics["render_seconds"] / rendered if rendered else None,
+    }
+
+
+def shutdown_renderer():
+    global _pool
+    if _pool is not None:
+        while not _pool.empty():
+            _pool.get_nowait().executor.shutdown(wait=True, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,104 @@
+import pandas as pd
+import plotly.graph_objects as go
+
+
+# Figure builders for the /stats charts. Each takes the chart's input data and returns a
+# Plotly figure, so the same chart can be rendered by a command or pre-rendered by a job.
+
+PIANO_GROUP_COLORS = {
+    "Advanced": "#05668d",
+    "Intermediate": "#427aa1",
+    "Novice": "#679436",
+    "Foundational": "#a5be00"
+}
+
+ROOM_COLORS = {
+    "PR9": "#102542",
+    "PR10": "#1f7a8c"
+}
+
+
+def build_piano_groups(count_dict):
+    labels = ["Foundational", "Novice", "Intermediate", "Advanced"]
+    values = [count_dict[label] for label in labels]
+
+    fig = go.Figure(data=[go.Pie(
+        labels=labels,
+        values=values,
+        marker=dict(colors=[PIANO_GROUP_COLORS[label] for label in labels]),
+        textinfo='value+percent',
+        sort=False
+    )])
+    fig.update_layout(
+        title="Piano-Playing Groups of Current Members",
+        legend=dict(traceorder="normal")
+    )
+    return fig
+
+
+def _build_top_bar(df, column, title, xaxis_title, color):
+    fig = go.Figure(data=go.Bar(
+        x=df[column],
+        y=df["Name"],
+        orientation='h',
+        text=df[column],
+        marker=dict(color=color)
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=xaxis_title,
+        yaxis_title='Name',
+        yaxis=dict(autorange='reversed', ticksuffix='  '),
+        plot_bgcolor='white',
+        title_x=0.5
+    )
+    return fig
+
+
+def build_message_count(df_msg):
+    return _build_top_bar(df_msg, "Message Count", 'Top 10 Message Senders', 'Total Messages', '#1985a1')
+
+
+def build_word_count(df_words):
+    return _build_top_bar(df_words, "Word Count", 'Top 10 Users by Word Count', 'Total Words', '#284b63')
+
+
+# data: {"ay": int, "rollups": booking_rollups rows for that AY}
+def build_weekly_session_popularity(data):
+    df_rollups = data["rollups"]
+    pivot_df = df_rollups.pivot(index='date', columns='room', values='registrants').fillna(0)
+    pivot_df.index = pd.to_datetime(pivot_df.index)
+
+    fig = go.Figure()
+
+    for room in pivot_df.columns:
+        fig.add_trace(go.Scatter(
+            x=pivot_df.index,
+            y=pivot_df[room],
+            mode='lines+markers',
+            name=str(room),
+            line=dict(color=ROOM_COLORS.get(room))
+        ))
+
+    fig.update_layout(
+        title=f"Trends in Room Registrations for AY{data['ay']}",
+        xaxis_title="Month",
+        yaxis_title="Number of Registrants",
+        plot_bgcolor='white',
+        title_x=0.5,
+        xaxis=dict(
+            tickformat="%b",
+            dtick="M1",
+            showgrid=True,
+            gridcolor="lightgray",
+            griddash="dash",
+            ticklabelmode="period",
+        ),
+        yaxis=dict(
+            showgrid=True,
+            gridcolor="lightgray",
+            griddash="dot",
+            rangemode="tozero"
+        )
+    )
+    return fig
@@ -0,0 +1,301 @@
+import sqlite3
+import threading
+import pandas as pd
+from datetime import datetime
+
+
+DB_PATH = "../databases/pe_helper.db"
+# Prepared statements kept per connection; enough for every query in this module
+DB_STATEMENT_CACHE = 256
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS users (
+    discord_id VARCHAR(32) PRIMARY KEY,
+    admin_number VARCHAR(7) UNIQUE,
+    name VARCHAR(100),
+    access_token TEXT NOT NULL,
+    refresh_token TEXT,
+    token_expiry TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS all_bookings (
+    booking_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date DATE NOT NULL,
+    room VARCHAR(50) NOT NULL,
+    time_slot VARCHAR(50) NOT NULL,
+    name VARCHAR(100),
+    admin_num VARCHAR(7),
+    AY INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_all_bookings_session ON all_bookings (date, room, time_slot);
+CREATE INDEX IF NOT EXISTS idx_all_bookings_ay ON all_bookings (AY, date, room);
+
+CREATE TABLE IF NOT EXISTS booking_rollups (
+    date DATE NOT NULL,
+    room VARCHAR(50) NOT NULL,
+    AY INTEGER NOT NULL,
+    registrants INTEGER NOT NULL,
+    PRIMARY KEY (date, room)
+);
+CREATE INDEX IF NOT EXISTS idx_booking_rollups_ay ON booking_rollups (AY, date);
+
+CREATE TABLE IF NOT EXISTS booking_slot_rollups (
+    date DATE NOT NULL,
+    room VARCHAR(50) NOT NULL,
+    time_slot VARCHAR(50) NOT NULL,
+    AY INTEGER NOT NULL,
+    registrants INTEGER NOT NULL,
+    PRIMARY KEY (date, room, time_slot)
+);
+CREATE INDEX IF NOT EXISTS idx_booking_slot_rollups_ay ON booking_slot_rollups (AY, date);
+
+CREATE TABLE IF NOT EXISTS member_piano_groups (
+    member_piano_groups_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Advanced INTEGER NOT NULL,
+    Intermediate INTEGER NOT NULL,
+    Novice INTEGER NOT NULL,
+    Foundational INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS summary_numbers (
+    summary_numbers_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    AY INTEGER NOT NULL UNIQUE,
+    members_num INTEGER NOT NULL,
+    alumni_num INTEGER NOT NULL,
+    new_members_num INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS links (
+    url TEXT PRIMARY KEY,
+    scanned INTEGER NOT NULL DEFAULT 0,
+    state INTEGER NOT NULL DEFAULT -1,
+    session_date DATE,
+    last_scraped DATE
+);
+CREATE INDEX IF NOT EXISTS idx_links_state ON links (state, session_date);
+
+CREATE TABLE IF NOT EXISTS composers (
+    composer VARCHAR(100) PRIMARY KEY,
+    searches INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS job_runs (
+    job_run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job VARCHAR(50) NOT NULL,
+    trigger VARCHAR(100) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    started_at TIMESTAMP NOT NULL,
+    duration_s REAL,
+    rows INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_job_runs_job ON job_runs (job, started_at);
+'''
+
+PIANO_GROUPS = ["Advanced", "Intermediate", "Novice", "Foundational"]
+
+_local = threading.local()
+
+
+# WAL lets the dashboard read while the bot writes, without either blocking the other
+def connect(path=DB_PATH, readonly=False):
+    if readonly:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30, cached_statements=DB_STATEMENT_CACHE)
+    else:
+        conn = sqlite3.connect(path, timeout=30, cached_statements=DB_STATEMENT_CACHE)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+    return conn
+
+
+def init_schema(conn):
+    conn.executescript(SCHEMA)
+    conn.commit()
+
+    # Rollups were added after bookings; backfill them once for existing databases
+    has_bookings = conn.execute("SELECT 1 FROM all_bookings LIMIT 1").fetchone()
+    has_rollups = all(conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() for table in ROLLUP_SQL)
+    if has_bookings and not has_rollups:
+        rebuild_booking_rollups(conn)
+
+
+# One connection per thread, created on first use
+def get_connection():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = connect()
+        init_schema(conn)
+        _local.conn = conn
+    return conn
+
+
+# Bookings
+def load_bookings(conn, ay=None):
+    query = "SELECT date, room, time_slot, name, admin_num, AY FROM all_bookings"
+    params = ()
+    if ay is not None:
+        query += " WHERE AY = ?"
+        params = (int(ay),)
+    return pd.read_sql_query(query + " ORDER BY date DESC, room, time_slot", conn, params=params)
+
+
+# Registrants per (date, room) and per (date, room, time_slot), kept in step with all_bookings
+# so charts read a few rows per session instead of aggregating every booking
+ROLLUP_SQL = {
+    "booking_rollups": (
+        "INSERT INTO booking_rollups (date, room, AY, registrants) "
+        "SELECT date, room, MAX(AY), COUNT(*) FROM all_bookings {where} GROUP BY date, room"
+    ),
+    "booking_slot_rollups": (
+        "INSERT INTO booking_slot_rollups (date, room, time_slot, AY, registrants) "
+        "SELECT date, room, time_slot, MAX(AY), COUNT(*) FROM all_bookings {where} GROUP BY date, room, time_slot"
+    ),
+}
+
+
+def _refresh_session_rollups(conn, date, room):
+    for table, sql in ROLLUP_SQL.items():
+        conn.execute(f"DELETE FROM {table} WHERE date = ? AND room = ?", (str(date), room))
+        conn.execute(sql.format(where="WHERE date = ? AND room = ?"), (str(date), room))
+
+
+def rebuild_booking_rollups(conn):
+    with conn:
+        for table, sql in ROLLUP_SQL.items():
+            conn.execute(f"DELETE FROM {table}")
+            conn.execute(sql.format(where=""))
+
+
+def replace_session(conn, date, room, df_session):
+    with conn:
+        conn.execute("DELETE FROM all_bookings WHERE date = ? AND room = ?", (str(date), room))
+        conn.executemany(
+            "INSERT INTO all_bookings (date, room, time_slot, name, admin_num, AY) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (str(row.date), row.room, row.time_slot, row.name, None if pd.isna(row.admin_num) else row.admin_num, int(row.AY))
+                for row in df_session.itertuples(index=False)
+            ]
+        )
+        _refresh_session_rollups(conn, date, room)
+
+
+def load_booking_rollups(conn, ays=None):
+    query = "SELECT date, room, AY, registrants FROM booking_rollups"
+    params = ()
+    if ays is not None:
+        ays = [int(ay) for ay in ays]
+        query += f" WHERE AY IN ({', '.join('?' * len(ays))})"
+        params = tuple(ays)
+    return pd.read_sql_query(query + " ORDER BY date, room", conn, params=params)
+
+
+def load_booking_slot_rollups(conn, ays=None):
+    query = "SELECT date, room, time_slot, AY, registrants FROM booking_slot_rollups"
+    params = ()
+    if ays is not None:
+        ays = [int(ay) for ay in ays]
+        query += f" WHERE AY IN ({', '.join('?' * len(ays))})"
+        params = tuple(ays)
+    return pd.read_sql_query(query + " ORDER BY date, room, time_slot", conn, params=params)
+
+
+# Links
+def load_links(conn):
+    return pd.read_sql_query("SELECT url, scanned, state, session_date, last_scraped FROM links ORDER BY rowid", conn)
+
+
+def load_link_urls(conn):
+    return {row[0] for row in conn.execute("SELECT url FROM links")}
+
+
+def insert_links(conn, urls, state=-1):
+    with conn:
+        conn.executemany("INSERT OR IGNORE INTO links (url, scanned, state) VALUES (?, 0, ?)", [(url, state) for url in urls])
+
+
+def save_links(conn, df_links):
+    def as_text(value):
+        return None if pd.isna(value) else str(value)
+
+    with conn:
+        conn.executemany(
+            '''
+            INSERT INTO links (url, scanned, state, session_date, last_scraped) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                scanned = excluded.scanned,
+                state = excluded.state,
+                session_date = excluded.session_date,
+                last_scraped = excluded.last_scraped
+            ''',
+            [
+                (row.url, int(row.scanned), int(row.state), as_text(row.session_date), as_text(row.last_scraped))
+                for row in df_links.itertuples(index=False)
+            ]
+        )
+
+
+# Piano groups: one row per count, latest row is current
+def save_piano_groups(conn, counts):
+    with conn:
+        conn.execute(
+            f"INSERT INTO member_piano_groups ({', '.join(PIANO_GROUPS)}) VALUES ({', '.join('?' * len(PIANO_GROUPS))})",
+            [counts[group] for group in PIANO_GROUPS]
+        )
+
+
+def load_piano_groups(conn):
+    return pd.read_sql_query(
+        f"SELECT {', '.join(PIANO_GROUPS)} FROM member_piano_groups ORDER BY member_piano_groups_id DESC LIMIT 1", conn
+    )
+
+
+# Summary numbers
+def replace_summary_numbers(conn, df):
+    with conn:
+        conn.execute("DELETE FROM summary_numbers")
+        conn.executemany(
+            "INSERT INTO summary_numbers (AY, members_num, alumni_num, new_members_num) VALUES (?, ?, ?, ?)",
+            [(int(row.AY), int(row.members_num), int(row.alumni_num), int(row.new_members_num)) for row in df.itertuples(index=False)]
+        )
+
+
+def load_summary_numbers(conn):
+    return pd.read_sql_query("SELECT AY, members_num, alumni_num, new_members_num FROM summary_numbers ORDER BY AY", conn)
+
+
+# Composers
+def seed_composers(conn, composers):
+    with conn:
+        conn.executemany("INSERT OR IGNORE INTO composers (composer, searches) VALUES (?, 0)", [(c,) for c in composers])
+
+
+def load_composers(conn):
+    return pd.read_sql_query("SELECT composer AS Composers, searches AS Searches FROM composers ORDER BY searches DESC, rowid", conn)
+
+
+def increment_composer(conn, composer, increment=1):
+    with conn:
+        conn.execute("UPDATE composers SET searches = searches + ? WHERE composer = ?", (increment, composer))
+
+
+# Job runs
+def record_job_run(conn, job, trigger, status, started_at, duration_s=None, rows=None, error=None):
+    with conn:
+        conn.execute(
+            "INSERT INTO job_runs (job, trigger, status, started_at, duration_s, rows, error) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job, trigger, status, started_at.isoformat(), duration_s, rows, error)
+        )
+
+
+def load_job_runs(conn, job=None, limit=10):
+    query = "SELECT job, trigger, status, started_at, duration_s, rows, error FROM job_runs"
+    params = ()
+    if job is not None:
+        query += " WHERE job = ?"
+        params = (job,)
+    return pd.read_sql_query(query + " ORDER BY job_run_id DESC LIMIT ?", conn, params=params + (int(limit),))
+
+
+def load_last_job_successes(conn):
+    rows = conn.execute("SELECT job, MAX(started_at) FROM job_runs WHERE status = 'success' GROUP BY job")
+    return {job: datetime.fromisoformat(started_at) for job, started_at in rows}
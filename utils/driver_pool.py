@@ -0,0 +1,129 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from concurrent.futures import ThreadPoolExecutor
+import os
+import queue
+import asyncio
+import threading
+import logging
+
+
+SCRAPER_POOL_SIZE = int(os.getenv("SCRAPER_POOL_SIZE", "3"))
+SCRAPE_LINK_TIMEOUT = int(os.getenv("SCRAPE_LINK_TIMEOUT", "120"))
+
+logger = logging.getLogger("pe_helper")
+
+
+def create_driver():
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36")
+    driver = webdriver.Chrome(options=chrome_options)
+    driver.set_page_load_timeout(SCRAPE_LINK_TIMEOUT)
+    return driver
+
+
+def _quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        logger.warning(f"Error quitting Chrome WebDriver: {e}", extra={"category": ["driver_pool", "quit_driver"]})
+
+
+# Pool of reusable headless Chrome drivers, each used by one worker thread at a time.
+# Drivers are started lazily, replaced when they crash, and force-quit when a job times out.
+class DriverPool:
+    def __init__(self, size=None, timeout=None):
+        self.size = size or SCRAPER_POOL_SIZE
+        self.timeout = timeout or SCRAPE_LINK_TIMEOUT
+        self.executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="scraper")
+        self.idle = queue.Queue()
+        self.drivers = set()
+        self.lock = threading.Lock()
+        # Jobs wait here rather than in the executor queue, so the timeout only covers scraping
+        self.slots = asyncio.Semaphore(self.size)
+
+
+    def _checkout(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        # Each worker thread holds at most one driver, so the pool never exceeds its size
+        driver = create_driver()
+        with self.lock:
+            self.drivers.add(driver)
+        logger.info(f"Started Chrome WebDriver ({len(self.drivers)}/{self.size}).", extra={"category": ["driver_pool", "checkout"]})
+        return driver
+
+
+    def _discard(self, driver):
+        with self.lock:
+            self.drivers.discard(driver)
+        _quit_driver(driver)
+
+
+    # Returns the driver to the idle queue, unless it was discarded while the job ran (after a timeout)
+    def _release(self, driver):
+        with self.lock:
+            alive = driver in self.drivers
+        if alive:
+            self.idle.put(driver)
+        return alive
+
+
+    def _run(self, func, args, holder):
+        driver = self._checkout()
+        holder["driver"] = driver
+        try:
+            result = func(driver, *args)
+        except TimeoutException:
+            # A page element never appeared; the driver itself is fine
+            self._release(driver)
+            raise
+        except WebDriverException:
+            # Crashed or force-quit after a timeout; the next job starts a fresh driver
+            self._discard(driver)
+            raise
+        except Exception as e:
+            # Errors from the job itself leave the driver usable. A discarded driver fails with
+            # whatever its dead connection raises (e.g. urllib3 errors), which is a crash too.
+            if not self._release(driver):
+                raise WebDriverException(f"Driver was discarded: {e!r}") from e
+            raise
+        self._release(driver)
+        return result
+
+
+    # Run func(driver, *args) on a pooled driver. A crashed driver is replaced and the job retried once.
+    async def run(self, func, *args, retries=1):
+        loop = asyncio.get_running_loop()
+        for attempt in range(retries + 1):
+            holder = {}
+            try:
+                async with self.slots:
+                    future = loop.run_in_executor(self.executor, self._run, func, args, holder)
+                    try:
+                        return await asyncio.wait_for(future, self.timeout)
+                    except asyncio.TimeoutError:
+                        # Quitting the driver makes the blocked worker thread raise and free itself
+                        if holder.get("driver"):
+                            await loop.run_in_executor(None, self._discard, holder["driver"])
+                        raise
+            except WebDriverException as e:
+                if attempt == retries or isinstance(e, TimeoutException):
+                    raise
+                logger.warning(f"Chrome WebDriver crashed, retrying with a new driver: {e}", extra={"category": ["driver_pool", "run"]})
+
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            drivers, self.drivers = list(self.drivers), set()
+        for driver in drivers:
+            await loop.run_in_executor(None, _quit_driver, driver)
+        self.executor.shutdown(wait=False)
+        logger.info(f"Closed driver pool ({len(drivers)} drivers).", extra={"category": ["driver_pool", "close"]})
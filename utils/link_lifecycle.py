@@ -0,0 +1,63 @@
+import pandas as pd
+import logging
+
+
+# Link states in the links table
+STATE_NEW = -1
+STATE_UNSCRAPABLE = 0
+STATE_UPCOMING = 1
+STATE_PASSED = 2
+
+# Days between re-scrapes of an upcoming session, by days left until the session.
+# Sign-ups change most in the last few days, so those are checked every run.
+RESCRAPE_INTERVALS = [
+    (2, 0),
+    (7, 1),
+    (None, 3),
+]
+
+logger = logging.getLogger("pe_helper")
+
+
+def ensure_lifecycle_columns(df_links):
+    for column in ["session_date", "last_scraped"]:
+        if column not in df_links.columns:
+            df_links[column] = None
+    df_links["session_date"] = pd.to_datetime(df_links["session_date"]).dt.date
+    df_links["last_scraped"] = pd.to_datetime(df_links["last_scraped"]).dt.date
+    return df_links
+
+
+def _rescrape_interval(days_left):
+    for max_days_left, interval in RESCRAPE_INTERVALS:
+        if max_days_left is None or days_left <= max_days_left:
+            return interval
+
+
+# Mark sessions whose date has passed as finalized, without loading their pages.
+# A session is final once it has been scraped successfully, or scraped at least once after its date.
+def finalize_passed_links(df_links, today):
+    session_date = df_links["session_date"]
+    known = session_date.notna()
+    passed = known & (session_date < today)
+    scraped_after = df_links["last_scraped"].notna() & (df_links["last_scraped"] > session_date)
+    to_finalize = passed & (df_links["state"] != STATE_UNSCRAPABLE) & (df_links["state"] != STATE_PASSED) & ((df_links["scanned"] == 1) | scraped_after)
+
+    df_links.loc[to_finalize, "state"] = STATE_PASSED
+    if to_finalize.any():
+        logger.info(f"Finalized {int(to_finalize.sum())} links for past sessions.", extra={"category": ["link_lifecycle", "finalize_passed_links"]})
+    return df_links
+
+
+def is_due(row, today):
+    if row["state"] in (STATE_UNSCRAPABLE, STATE_PASSED):
+        return False
+    if pd.isna(row["session_date"]) or pd.isna(row["last_scraped"]):
+        return True
+
+    days_left = (row["session_date"] - today).days
+    return (today - row["last_scraped"]).days >= _rescrape_interval(days_left)
+
+
+def links_due(df_links, today):
+    return [row["url"] for _, row in df_links.iterrows() if is_due(row, today)]
@@ -0,0 +1,264 @@
+import os
+import time
+import asyncio
+import logging
+import pandas as pd
+import pyarrow.parquet as pq
+import discord
+
+
+# Partitioned message archive:
+#   ../data/messages/channel_id=<id>/month=<YYYY-MM>/part-<ns>.parquet
+# Each run appends new part files only; compaction later merges a partition's parts into one file.
+# Rows are events: the newest revision of a message_id wins and "delete" events hide the message.
+ARCHIVE_DIR = "../data/messages"
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))
+MESSAGE_COLUMNS = ["message_id", "author", "channel", "timestamp", "content", "event", "revision"]
+EXCLUDED_CATEGORIES = {"Commands"}
+# Touched after each crawl, compaction & migration. Readers key their caches on it rather than on the
+# part files, which live capture adds every flush.
+ARCHIVE_MARKER = os.path.join(ARCHIVE_DIR, "_updated")
+
+logger = logging.getLogger("pe_helper")
+
+
+def is_archived_channel(channel):
+    return not (channel.category and channel.category.name in EXCLUDED_CATEGORIES)
+
+
+# Replace raw mention markup with readable names
+def format_content(message):
+    content = message.content
+
+    for user in message.mentions:
+        content = content.replace(f"<@{user.id}>", f"@{user.display_name}")
+        content = content.replace(f"<@!{user.id}>", f"@{user.display_name}")
+
+    for role in message.role_mentions:
+        content = content.replace(f"<@&{role.id}>", f"@{role.name}")
+
+    for mentioned_channel in message.channel_mentions:
+        content = content.replace(f"<#{mentioned_channel.id}>", f"#{mentioned_channel.name}")
+
+    return content
+
+
+def message_to_row(message, event="create"):
+    return {
+        "message_id": message.id,
+        "channel_id": message.channel.id,
+        "author": message.author.display_name,
+        "channel": message.channel.name,
+        "timestamp": message.created_at,
+        "content": format_content(message),
+        "event": event,
+        "revision": time.time_ns()
+    }
+
+
+def deleted_message_row(message_id, channel):
+    return {
+        "message_id": message_id,
+        "channel_id": channel.id,
+        "author": "",
+        "channel": channel.name,
+        "timestamp": discord.utils.snowflake_time(message_id),
+        "content": "",
+        "event": "delete",
+        "revision": time.time_ns()
+    }
+
+
+def partition_path(channel_id, month):
+    return os.path.join(ARCHIVE_DIR, f"channel_id={channel_id}", f"month={month}")
+
+
+def _part_files(path):
+    if not os.path.isdir(path):
+        return []
+    return sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith(".parquet"))
+
+
+def _write_part(path, df, prefix="part"):
+    os.makedirs(path, exist_ok=True)
+    filename = os.path.join(path, f"{prefix}-{time.time_ns()}.parquet")
+
+    # Write under a temporary name first so readers never see a half-written part
+    tmp_filename = f"{filename}.tmp"
+    df.to_parquet(tmp_filename, index=False)
+    os.replace(tmp_filename, filename)
+    return filename
+
+
+def _month_of(timestamps):
+    return pd.to_datetime(timestamps, utc=True).dt.strftime("%Y-%m")
+
+
+# Append new messages. df must contain channel_id alongside MESSAGE_COLUMNS.
+def append_messages(df):
+    if df.empty:
+        return 0
+
+    df = df.assign(month=_month_of(df["timestamp"]))
+    written = 0
+    for (channel_id, month), group in df.groupby(["channel_id", "month"], sort=True):
+        _write_part(partition_path(channel_id, month), group.drop(columns=["channel_id", "month"]))
+        written += 1
+
+    logger.info(f"Appended {len(df)} messages across {written} partitions.", extra={"category": ["message_archive", "append_messages"]})
+    return written
+
+
+# Buffers rows for one channel and appends them to the archive in fixed-size batches,
+# so memory stays bounded however long the history is. on_flush(last_message_id) is
+# called after each batch is on disk, which is where callers checkpoint their cursor.
+class MessageBatchWriter:
+    def __init__(self, on_flush=None, batch_size=None):
+        self.on_flush = on_flush
+        self.batch_size = batch_size or ARCHIVE_BATCH_SIZE
+        self.rows = []
+        self.written = 0
+
+    async def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        if not self.rows:
+            return
+
+        rows, self.rows = self.rows, []
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, append_messages, pd.DataFrame(rows))
+        self.written += len(rows)
+
+        if self.on_flush:
+            self.on_flush(max(row["message_id"] for row in rows))
+
+
+def list_partitions(channel_ids=None, months=None):
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+
+    channel_ids = {str(c) for c in channel_ids} if channel_ids is not None else None
+    months = set(months) if months is not None else None
+
+    partitions = []
+    for channel_dir in sorted(os.listdir(ARCHIVE_DIR)):
+        if not channel_dir.startswith("channel_id="):
+            continue
+        channel_id = channel_dir.split("=", 1)[1]
+        if channel_ids is not None and channel_id not in channel_ids:
+            continue
+
+        for month_dir in sorted(os.listdir(os.path.join(ARCHIVE_DIR, channel_dir))):
+            if not month_dir.startswith("month="):
+                continue
+            month = month_dir.split("=", 1)[1]
+            if months is not None and month not in months:
+                continue
+            partitions.append((channel_id, month))
+
+    return partitions
+
+
+def _read_part(filename, columns):
+    # Parts written before live capture have no event/revision columns
+    available = pq.read_schema(filename).names
+    df = pd.read_parquet(filename, columns=[c for c in columns if c in available])
+    if "event" not in df.columns:
+        df["event"] = "create"
+    if "revision" not in df.columns:
+        df["revision"] = 0
+    return df
+
+
+# Keep the newest revision of each message and drop deleted ones
+def _resolve_events(df):
+    df = df.sort_values("revision", kind="stable")
+    df = df.drop_duplicates(subset="message_id", keep="last")
+    return df[df["event"] != "delete"].sort_values("message_id", ignore_index=True)
+
+
+def read_partition(channel_id, month, columns=None):
+    files = _part_files(partition_path(channel_id, month))
+    if not files:
+        return pd.DataFrame(columns=columns or MESSAGE_COLUMNS)
+
+    # message_id/event/revision are always read so duplicates and deletes can be resolved
+    read_columns = MESSAGE_COLUMNS if columns is None else list(dict.fromkeys(["message_id", "event", "revision", *columns]))
+    df = pd.concat([_read_part(f, read_columns) for f in files], ignore_index=True)
+    df = _resolve_events(df)
+    return df if columns is None else df[columns]
+
+
+# Load the archive, restricted to the given channels/months so unrelated partitions are never opened.
+def read_archive(channel_ids=None, months=None, columns=None):
+    frames = []
+    for channel_id, month in list_partitions(channel_ids, months):
+        df = read_partition(channel_id, month, columns)
+        if not df.empty:
+            frames.append(df.assign(channel_id=int(channel_id)))
+
+    if not frames:
+        return pd.DataFrame(columns=(columns or MESSAGE_COLUMNS) + ["channel_id"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def compact_partition(channel_id, month):
+    files = _part_files(partition_path(channel_id, month))
+    if len(files) < 2:
+        return False
+
+    df = read_partition(channel_id, month)
+    _write_part(partition_path(channel_id, month), df, prefix="compacted")
+
+    # Merged file is in place; old parts can go
+    for f in files:
+        os.remove(f)
+    return True
+
+
+def mark_archive_updated():
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    with open(ARCHIVE_MARKER, "w", encoding="utf-8") as f:
+        f.write(str(time.time()))
+
+
+# mtime of the marker, or None before the first crawl
+def archive_updated_at():
+    try:
+        return os.path.getmtime(ARCHIVE_MARKER)
+    except FileNotFoundError:
+        return None
+
+
+def compact_archive():
+    compacted = 0
+    for channel_id, month in list_partitions():
+        try:
+            if compact_partition(channel_id, month):
+                compacted += 1
+        except Exception as e:
+            logger.error(f"Failed to compact partition channel_id={channel_id}/month={month}: {e}", exc_info=True, extra={"category": ["message_archive", "compact_archive"]})
+
+    mark_archive_updated()
+    logger.info(f"Compacted {compacted} message archive partitions.", extra={"category": ["message_archive", "compact_archive"]})
+    return compacted
+
+
+# One-shot migration of the old single-file archive. channel_ids maps channel names to IDs.
+def migrate_legacy_archive(legacy_path, channel_ids):
+    if not os.path.exists(legacy_path):
+        return 0
+
+    df = pd.read_parquet(legacy_path)
+    df["event"] = "create"
+    df["revision"] = 0
+    df["channel_id"] = df["channel"].map(channel_ids).fillna(0).astype("int64")
+    append_messages(df)
+    os.replace(legacy_path, f"{legacy_path}.migrated")
+    mark_archive_updated()
+    logger.info(f"Migrated {len(df)} messages from {legacy_path} into partitioned archive.", extra={"category": ["message_archive", "migrate_legacy_archive"]})
+    return len(df)
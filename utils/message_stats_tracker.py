@@ -0,0 +1,107 @@
+import os
+import json
+import threading
+import discord
+import pandas as pd
+
+
+STATS_FILE = "../data/message_stats.json"
+TOP_MESSAGES_CSV = "../data/top_messages.csv"
+TOP_WORDS_CSV = "../data/top_words.csv"
+STATS_ROLES = ['Member', 'Alumni']
+
+# Persisted state: per-author counters plus a per-channel message-ID cursor
+# marking how far each channel has been counted. Loaded once and shared by
+# the daily crawl and live capture so neither overwrites the other's counts.
+_message_stats = None
+# Saves run from both the event loop and executor threads; they share one temp file
+_save_lock = threading.Lock()
+
+
+def load_message_stats():
+    global _message_stats
+    if _message_stats is None:
+        _message_stats = {"authors": {}, "cursors": {}, "live_ranges": {}}
+        if os.path.exists(STATS_FILE):
+            with open(STATS_FILE, "r", encoding="utf-8") as f:
+                _message_stats.update(json.load(f))
+    return _message_stats
+
+
+def reset_message_stats():
+    stats = load_message_stats()
+    stats["authors"].clear()
+    stats["cursors"].clear()
+    stats["live_ranges"].clear()
+    return stats
+
+
+def save_message_stats(stats):
+    tmp_path = f"{STATS_FILE}.tmp"
+    with _save_lock:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(stats, f)
+        os.replace(tmp_path, STATS_FILE)
+
+
+def record_message(stats, author_id, name, words):
+    author = stats["authors"].setdefault(str(author_id), {"name": name, "messages": 0, "words": 0})
+    author["name"] = name  # Keep latest display name
+    author["messages"] += 1
+    author["words"] += words
+
+
+# Undo a counted message that was later deleted
+def unrecord_message(stats, author_id, words):
+    author = stats["authors"].get(str(author_id))
+    if author is None:
+        return
+    author["messages"] = max(author["messages"] - 1, 0)
+    author["words"] = max(author["words"] - words, 0)
+
+
+def advance_cursor(stats, channel_id, message_id):
+    if message_id > stats["cursors"].get(str(channel_id), 0):
+        stats["cursors"][str(channel_id)] = message_id
+
+
+# Message-ID ranges [floor, latest] counted by live capture in channels whose crawl has not caught up.
+# They are persisted with the cursors, so after a restart or reconnect the crawl skips them instead of
+# counting those messages again. Each capture session adds its own range, starting at its floor.
+def record_live_range(stats, channel_id, floor, latest_id):
+    ranges = stats["live_ranges"].setdefault(str(channel_id), [])
+    for r in ranges:
+        if r[0] == floor:
+            r[1] = max(r[1], latest_id)
+            return
+    ranges.append([floor, latest_id])
+
+
+def counted_live(stats, channel_id, message_id):
+    return any(low <= message_id <= high for low, high in stats["live_ranges"].get(str(channel_id), []))
+
+
+# Once the crawl has read a channel up to live capture, its cursor covers every range
+def clear_live_ranges(stats, channel_id):
+    stats["live_ranges"].pop(str(channel_id), None)
+
+
+# Channels whose messages count towards stats: those visible to members or alumni
+def is_counted_channel(channel):
+    role_objs = [discord.utils.get(channel.guild.roles, name=r) for r in STATS_ROLES]
+    return any(channel.permissions_for(role).view_channel for role in role_objs if role)
+
+
+# Write the top 10 tables read by /stats message-stats
+def export_top_csvs(stats):
+    df = pd.DataFrame([
+        {"Name": a["name"], "Message Count": a["messages"], "Word Count": a["words"]}
+        for a in stats["authors"].values()
+    ], columns=["Name", "Message Count", "Word Count"])
+
+    df_msg = df.sort_values("Message Count", ascending=False).head(10).drop('Word Count', axis=1).reset_index(drop=True)
+    df_words = df.sort_values("Word Count", ascending=False).head(10).drop('Message Count', axis=1).reset_index(drop=True)
+    with _save_lock:
+        df_msg.to_csv(TOP_MESSAGES_CSV, index=False)
+        df_words.to_csv(TOP_WORDS_CSV, index=False)
+    return df_msg, df_words
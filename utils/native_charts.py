@@ -0,0 +1,318 @@
+import math
+from io import BytesIO
+from datetime import datetime
+from PIL import Image, ImageDraw, ImageFont
+
+
+# Draws the /stats chart types (pie, horizontal bar, line time series) straight to PNG with Pillow,
+# from a Plotly figure's JSON dict, so charts render without Kaleido's headless Chromium.
+# Only the trace & layout properties our figures use are read; colours and labels come from the figure.
+WIDTH = 700
+HEIGHT = 500
+SCALE = 2  # Drawn at 2x for sharper text in Discord
+
+# Plotly's default colorway, for traces without an explicit colour
+COLORWAY = ["#636efa", "#EF553B", "#00cc96", "#ab63fa", "#FFA15A", "#19d3f3", "#FF6692", "#B6E880", "#FF97FF", "#FECB52"]
+TEXT_COLOR = "#2a3f5f"
+GRID_COLOR = "#ebf0f8"
+NAMED_COLORS = {"lightgray": "#d3d3d3", "white": "#ffffff"}
+
+_fonts = {}
+
+
+def _font(size):
+    size = int(size * SCALE)
+    if size not in _fonts:
+        try:
+            _fonts[size] = ImageFont.truetype("DejaVuSans.ttf", size)
+        except OSError:
+            _fonts[size] = ImageFont.load_default(size)
+    return _fonts[size]
+
+
+def _color(value, default):
+    if not value:
+        return default
+    return NAMED_COLORS.get(value, value)
+
+
+def _text_size(draw, text, font):
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    return right - left, bottom - top
+
+
+def _title_text(value):
+    if isinstance(value, dict):
+        return value.get("text") or ""
+    return value or ""
+
+
+def _draw_title(draw, layout):
+    title = _title_text(layout.get("title"))
+    if not title:
+        return
+    font = _font(17)
+    w, _ = _text_size(draw, title, font)
+    title_x = layout["title"].get("x") if isinstance(layout.get("title"), dict) else None
+    x = (WIDTH * SCALE - w) / 2 if title_x == 0.5 else 40 * SCALE
+    draw.text((x, 18 * SCALE), title, fill=TEXT_COLOR, font=font)
+
+
+def _draw_legend(draw, items, x, y):
+    font = _font(12)
+    for label, color in items:
+        draw.rectangle([x, y + 2 * SCALE, x + 12 * SCALE, y + 14 * SCALE], fill=color)
+        draw.text((x + 18 * SCALE, y), str(label), fill=TEXT_COLOR, font=font)
+        y += 20 * SCALE
+
+
+def _nice_ticks(vmax, count=5):
+    if vmax <= 0:
+        return [0, 1]
+    raw = vmax / count
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    ticks = [0]
+    while ticks[-1] < vmax:
+        ticks.append(round(ticks[-1] + step, 10))
+    return ticks
+
+
+def _format_number(value):
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+
+def _vertical_text(image, text, font, center):
+    draw = ImageDraw.Draw(image)
+    w, h = _text_size(draw, text, font)
+    label = Image.new("RGBA", (w + 4, h + 8), (255, 255, 255, 0))
+    ImageDraw.Draw(label).text((2, 0), text, fill=TEXT_COLOR, font=font)
+    label = label.rotate(90, expand=True)
+    image.paste(label, (int(center[0] - label.width / 2), int(center[1] - label.height / 2)), label)
+
+
+def _dashed_line(draw, start, end, color, dash, width=1):
+    (x0, y0), (x1, y1) = start, end
+    length = math.hypot(x1 - x0, y1 - y0)
+    if length == 0:
+        return
+    dx, dy = (x1 - x0) / length, (y1 - y0) / length
+    pos = 0
+    while pos < length:
+        seg_end = min(pos + dash, length)
+        draw.line([(x0 + dx * pos, y0 + dy * pos), (x0 + dx * seg_end, y0 + dy * seg_end)], fill=color, width=width)
+        pos += dash * 2
+
+
+def _draw_pie(image, draw, trace, layout):
+    labels = trace.get("labels", [])
+    values = [float(v) for v in trace.get("values", [])]
+    colors = (trace.get("marker") or {}).get("colors") or COLORWAY
+    total = sum(values)
+
+    radius = 160 * SCALE
+    cx, cy = 300 * SCALE, 270 * SCALE
+    box = [cx - radius, cy - radius, cx + radius, cy + radius]
+    font = _font(12)
+
+    # Plotly starts at 12 o'clock and goes clockwise
+    angle = -90.0
+    for i, value in enumerate(values):
+        if total <= 0 or value <= 0:
+            continue
+        sweep = 360 * value / total
+        draw.pieslice(box, angle, angle + sweep, fill=_color(colors[i % len(colors)], COLORWAY[0]), outline="white", width=SCALE)
+
+        text = []
+        if "value" in trace.get("textinfo", ""):
+            text.append(_format_number(int(value) if value.is_integer() else value))
+        if "percent" in trace.get("textinfo", ""):
+            text.append(f"{100 * value / total:.1f}%")
+        if text:
+            mid = math.radians(angle + sweep / 2)
+            tx, ty = cx + math.cos(mid) * radius * 0.65, cy + math.sin(mid) * radius * 0.65
+            for line_no, line in enumerate(text):
+                w, h = _text_size(draw, line, font)
+                draw.text((tx - w / 2, ty - h * len(text) / 2 - 2 * SCALE + line_no * (h + 4 * SCALE)), line, fill="white", font=font)
+        angle += sweep
+
+    _draw_legend(draw, [(label, _color(colors[i % len(colors)], COLORWAY[0])) for i, label in enumerate(labels)], 520 * SCALE, 100 * SCALE)
+
+
+def _plot_area(draw, layout, y_labels=()):
+    tick_font = _font(12)
+    yaxis = layout.get("yaxis") or {}
+    suffix = yaxis.get("ticksuffix", "")
+    label_width = max((_text_size(draw, f"{label}{suffix}", tick_font)[0] for label in y_labels), default=30 * SCALE)
+    left = 40 * SCALE + label_width
+    return left, 70 * SCALE, WIDTH * SCALE - 40 * SCALE, HEIGHT * SCALE - 70 * SCALE
+
+
+def _draw_axis_titles(image, draw, layout, area):
+    left, top, right, bottom = area
+    font = _font(14)
+    x_title = _title_text((layout.get("xaxis") or {}).get("title"))
+    y_title = _title_text((layout.get("yaxis") or {}).get("title"))
+    if x_title:
+        w, _ = _text_size(draw, x_title, font)
+        draw.text(((left + right - w) / 2, bottom + 35 * SCALE), x_title, fill=TEXT_COLOR, font=font)
+    if y_title:
+        _vertical_text(image, y_title, font, (14 * SCALE, (top + bottom) / 2))
+
+
+def _draw_horizontal_bar(image, draw, trace, layout):
+    names = [str(n) for n in trace.get("y", [])]
+    values = [float(v) for v in trace.get("x", [])]
+    texts = trace.get("text") or values
+    color = _color((trace.get("marker") or {}).get("color"), COLORWAY[0])
+    yaxis = layout.get("yaxis") or {}
+    suffix = yaxis.get("ticksuffix", "")
+
+    area = _plot_area(draw, layout, names)
+    left, top, right, bottom = area
+    ticks = _nice_ticks(max(values, default=0))
+    scale = (right - left) / ticks[-1]
+    tick_font = _font(12)
+
+    for tick in ticks:
+        x = left + tick * scale
+        draw.line([(x, top), (x, bottom)], fill=GRID_COLOR, width=SCALE)
+        label = _format_number(tick)
+        w, _ = _text_size(draw, label, tick_font)
+        draw.text((x - w / 2, bottom + 8 * SCALE), label, fill=TEXT_COLOR, font=tick_font)
+
+    if not names:
+        _draw_axis_titles(image, draw, layout, area)
+        return
+
+    # autorange "reversed" puts the first bar at the top, as in the Plotly figures
+    order = range(len(names)) if yaxis.get("autorange") == "reversed" else reversed(range(len(names)))
+    band = (bottom - top) / len(names)
+    for row, i in enumerate(order):
+        y0 = top + row * band + band * 0.1
+        y1 = top + (row + 1) * band - band * 0.1
+        x1 = left + values[i] * scale
+        draw.rectangle([left, y0, x1, y1], fill=color)
+
+        label = f"{names[i]}{suffix}"
+        w, h = _text_size(draw, label, tick_font)
+        draw.text((left - w - 6 * SCALE, (y0 + y1 - h) / 2), label, fill=TEXT_COLOR, font=tick_font)
+
+        text = _format_number(int(float(texts[i])) if float(texts[i]).is_integer() else texts[i])
+        w, h = _text_size(draw, text, tick_font)
+        if x1 - left > w + 8 * SCALE:
+            draw.text((x1 - w - 4 * SCALE, (y0 + y1 - h) / 2), text, fill="white", font=tick_font)
+        else:
+            draw.text((x1 + 4 * SCALE, (y0 + y1 - h) / 2), text, fill=TEXT_COLOR, font=tick_font)
+
+    _draw_axis_titles(image, draw, layout, area)
+
+
+def _parse_x(value):
+    return datetime.fromisoformat(str(value).replace("Z", ""))
+
+
+def _month_starts(start, end):
+    month = datetime(start.year, start.month, 1)
+    while month <= end:
+        yield month
+        month = datetime(month.year + (month.month == 12), month.month % 12 + 1, 1)
+
+
+def _draw_time_series(image, draw, traces, layout):
+    area = _plot_area(draw, layout)
+    left, top, right, bottom = area
+    right -= 80 * SCALE  # Room for the legend
+    tick_font = _font(12)
+    xaxis = layout.get("xaxis") or {}
+    yaxis = layout.get("yaxis") or {}
+
+    series = []
+    for i, trace in enumerate(traces):
+        xs = [_parse_x(x) for x in trace.get("x", [])]
+        ys = [float(y) for y in trace.get("y", [])]
+        color = _color((trace.get("line") or {}).get("color"), COLORWAY[i % len(COLORWAY)])
+        series.append((trace.get("name", f"trace {i}"), xs, ys, color))
+
+    all_x = [x for _, xs, _, _ in series for x in xs]
+    all_y = [y for _, _, ys, _ in series for y in ys]
+    if not all_x:
+        _draw_axis_titles(image, draw, layout, (left, top, right, bottom))
+        return
+
+    x_min = datetime(min(all_x).year, min(all_x).month, 1)
+    x_max = max(all_x)
+    months = list(_month_starts(x_min, x_max))
+    x_end = datetime(x_max.year + (x_max.month == 12), x_max.month % 12 + 1, 1)
+    span = (x_end - x_min).total_seconds() or 1
+
+    ticks = _nice_ticks(max(all_y, default=0))
+    y_scale = (bottom - top) / ticks[-1]
+
+    def px(x):
+        return left + (x - x_min).total_seconds() / span * (right - left)
+
+    def py(y):
+        return bottom - y * y_scale
+
+    grid_color = _color(yaxis.get("gridcolor"), GRID_COLOR)
+    for tick in ticks:
+        dash = 2 * SCALE if yaxis.get("griddash") == "dot" else 6 * SCALE
+        _dashed_line(draw, (left, py(tick)), (right, py(tick)), grid_color, dash, SCALE)
+        label = _format_number(tick)
+        w, h = _text_size(draw, label, tick_font)
+        draw.text((left - w - 8 * SCALE, py(tick) - h / 2), label, fill=TEXT_COLOR, font=tick_font)
+
+    # Monthly ticks, labelled mid-period like ticklabelmode="period"
+    tick_format = xaxis.get("tickformat", "%b")
+    x_grid_color = _color(xaxis.get("gridcolor"), GRID_COLOR)
+    for month in months:
+        _dashed_line(draw, (px(month), top), (px(month), bottom), x_grid_color, 6 * SCALE, SCALE)
+        next_month = datetime(month.year + (month.month == 12), month.month % 12 + 1, 1)
+        label = month.strftime(tick_format)
+        w, _ = _text_size(draw, label, tick_font)
+        draw.text(((px(month) + px(next_month) - w) / 2, bottom + 8 * SCALE), label, fill=TEXT_COLOR, font=tick_font)
+
+    for name, xs, ys, color in series:
+        points = [(px(x), py(y)) for x, y in sorted(zip(xs, ys))]
+        if len(points) > 1:
+            draw.line(points, fill=color, width=2 * SCALE, joint="curve")
+        for x, y in points:
+            r = 3 * SCALE
+            draw.ellipse([x - r, y - r, x + r, y + r], fill=color)
+
+    _draw_legend(draw, [(name, color) for name, _, _, color in series], right + 20 * SCALE, top)
+    _draw_axis_titles(image, draw, layout, (left, top, right, bottom))
+
+
+def is_supported(fig_dict):
+    traces = fig_dict.get("data", [])
+    types = {trace.get("type", "scatter") for trace in traces}
+    if types == {"pie"} and len(traces) == 1:
+        return True
+    if types == {"bar"} and len(traces) == 1 and traces[0].get("orientation") == "h":
+        return True
+    return types <= {"scatter"}
+
+
+# fig_dict: a Plotly figure as plain JSON types (json.loads(fig.to_json()))
+def render_native(fig_dict):
+    if not is_supported(fig_dict):
+        raise ValueError("Figure has trace types the native renderer does not draw")
+
+    image = Image.new("RGB", (WIDTH * SCALE, HEIGHT * SCALE), "white")
+    draw = ImageDraw.Draw(image)
+    traces = fig_dict.get("data", [])
+    layout = fig_dict.get("layout", {})
+
+    if traces and traces[0].get("type") == "pie":
+        _draw_pie(image, draw, traces[0], layout)
+    elif traces and traces[0].get("type") == "bar":
+        _draw_horizontal_bar(image, draw, traces[0], layout)
+    else:
+        _draw_time_series(image, draw, traces, layout)
+    _draw_title(draw, layout)
+
+    buf = BytesIO()
+    image.save(buf, format="png", optimize=True)
+    return buf.getvalue()
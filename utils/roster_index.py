@@ -0,0 +1,120 @@
+import logging
+from collections import defaultdict
+
+
+PIANO_GROUPS = ["Advanced", "Intermediate", "Novice", "Foundational"]  # Highest first
+STATUS_ROLES = ["Current EXCO", "Alumni", "Member"]  # Highest first
+
+logger = logging.getLogger("pe_helper")
+
+_roster = None
+
+
+# AY runs from April 1st to March 31st
+def join_ay(joined_at):
+    return joined_at.year if joined_at.month >= 4 else joined_at.year - 1
+
+
+# Guild roster (bots excluded) indexed by role name, status, piano group and join AY, so commands
+# look members up instead of scanning guild.members. Built once, then kept current by cogs/roster.py.
+class RosterIndex:
+    def __init__(self):
+        self.members = {}
+        self.by_role = defaultdict(set)
+        self.by_status = defaultdict(set)
+        self.by_piano_group = defaultdict(set)
+        self.by_join_ay = defaultdict(set)
+
+
+    def build(self, guild):
+        for index in (self.members, self.by_role, self.by_status, self.by_piano_group, self.by_join_ay):
+            index.clear()
+        for m in guild.members:
+            self.add(m)
+        logger.info(f"Roster index built with {len(self.members)} members.", extra={"category": ["roster_index", "build"]})
+
+
+    def add(self, member):
+        if member.bot:
+            return
+        self.remove(member.id)
+
+        roles = {r.name for r in member.roles}
+        entry = {
+            "id": member.id,
+            "name": member.name,
+            "nick": member.nick,
+            "display_name": member.display_name,
+            "joined_at": member.joined_at,
+            "roles": roles,
+            "status": next((s for s in STATUS_ROLES if s in roles), None),
+            "piano_groups": [g for g in PIANO_GROUPS if g in roles],
+            "join_ay": join_ay(member.joined_at) if member.joined_at else None,
+        }
+        self.members[member.id] = entry
+
+        for role in roles:
+            self.by_role[role].add(member.id)
+        if entry["status"]:
+            self.by_status[entry["status"]].add(member.id)
+        if entry["piano_groups"]:
+            self.by_piano_group[entry["piano_groups"][0]].add(member.id)
+        if entry["join_ay"] is not None:
+            self.by_join_ay[entry["join_ay"]].add(member.id)
+
+
+    def remove(self, member_id):
+        entry = self.members.pop(member_id, None)
+        if entry is None:
+            return
+
+        for role in entry["roles"]:
+            self.by_role[role].discard(member_id)
+        if entry["status"]:
+            self.by_status[entry["status"]].discard(member_id)
+        if entry["piano_groups"]:
+            self.by_piano_group[entry["piano_groups"][0]].discard(member_id)
+        if entry["join_ay"] is not None:
+            self.by_join_ay[entry["join_ay"]].discard(member_id)
+
+
+    def entries(self, ids):
+        return [self.members[i] for i in ids]
+
+
+    def with_roles(self, *roles):
+        sets = sorted((self.by_role.get(r, set()) for r in roles), key=len)
+        return set.intersection(*sets) if sets else set()
+
+
+    def display_names(self, ids):
+        return sorted((self.members[i]["display_name"] for i in ids), key=str.lower)
+
+
+    # Current members by their highest piano group
+    def piano_group_counts(self):
+        current = self.by_role.get("Member", set())
+        return {g: len(self.by_piano_group.get(g, set()) & current) for g in PIANO_GROUPS}
+
+
+    # {AY: {members_num, alumni_num, new_members_num}} by the AY each member joined in
+    def summary_numbers(self):
+        members = self.by_role.get("Member", set())
+        alumni = self.by_role.get("Alumni", set())
+        return {
+            ay: {
+                "members_num": len(ids & members),
+                "alumni_num": len((ids & alumni) - members),
+                "new_members_num": len(ids),
+            }
+            for ay, ids in self.by_join_ay.items() if ids
+        }
+
+
+# Shared index; built from the guild on first use
+def get_roster(guild):
+    global _roster
+    if _roster is None:
+        _roster = RosterIndex()
+        _roster.build(guild)
+    return _roster
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import time
+import traceback
+from datetime import datetime, timedelta
+from utils.variables import SGT
+from utils.async_db import run_db
+from utils.database import load_last_job_successes, record_job_run
+
+
+# Cron fields: minute hour day-of-month month day-of-week (0 = Monday), in SGT.
+# Each field accepts *, */n, a, a-b, a-b/n and comma-separated lists of those.
+CRON_FIELDS = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+STATUS_SUCCESS = "success"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+logger = logging.getLogger("pe_helper")
+
+
+def _parse_field(field, low, high):
+    values = set()
+    for part in field.split(","):
+        expr, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if expr == "*":
+            start, end = low, high
+        elif "-" in expr:
+            start, end = (int(v) for v in expr.split("-"))
+        else:
+            start = int(expr)
+            end = high if step > 1 else start
+        if not (low <= start <= end <= high) or step < 1:
+            raise ValueError(f"Invalid cron field: {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def parse_cron(expr):
+    fields = expr.split()
+    if len(fields) != len(CRON_FIELDS):
+        raise ValueError(f"Cron expression needs {len(CRON_FIELDS)} fields: {expr}")
+    return [_parse_field(field, low, high) for field, (low, high) in zip(fields, CRON_FIELDS)]
+
+
+def cron_matches(cron, dt):
+    minutes, hours, days, months, weekdays = cron
+    return dt.minute in minutes and dt.hour in hours and dt.day in days and dt.month in months and dt.weekday() in weekdays
+
+
+# First matching minute strictly after `after`; searches up to a year ahead
+def next_run(cron, after):
+    dt = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    for _ in range(366 * 24 * 60):
+        if cron_matches(cron, dt):
+            return dt
+        dt += timedelta(minutes=1)
+    return None
+
+
+# Latest matching minute at or before `before`; searches up to a year back
+def previous_run(cron, before):
+    dt = before.replace(second=0, microsecond=0)
+    for _ in range(366 * 24 * 60):
+        if cron_matches(cron, dt):
+            return dt
+        dt -= timedelta(minutes=1)
+    return None
+
+
+class Job:
+    def __init__(self, name, func, cron=None, depends_on=()):
+        self.name = name
+        self.func = func
+        self.cron = parse_cron(cron) if cron else None
+        self.cron_expr = cron
+        self.depends_on = list(depends_on)
+        self.lock = asyncio.Lock()
+
+
+# Runs async jobs on cron cadences. Every job is single-flight: a trigger that arrives while the
+# job is running is recorded as skipped instead of overlapping it. Jobs due at the same minute run
+# as one group, where each job waits only for its own dependencies and independent jobs run concurrently.
+# Jobs return the number of rows they processed (or None); every run is recorded in job_runs.
+class Scheduler:
+    def __init__(self):
+        self.jobs = {}
+        self._task = None
+
+
+    def add_job(self, name, func, cron=None, depends_on=()):
+        for dependency in depends_on:
+            if dependency not in self.jobs:
+                raise ValueError(f"Job {name} depends on unknown job {dependency}")
+        self.jobs[name] = Job(name, func, cron, depends_on)
+
+
+    def is_running(self, name):
+        return self.jobs[name].lock.locked()
+
+
+    def next_runs(self, now=None):
+        now = now or datetime.now(SGT)
+        return {name: next_run(job.cron, now) if job.cron else None for name, job in self.jobs.items()}
+
+
+    # Jobs whose latest scheduled run has no successful run since, e.g. because the bot was down.
+    # Jobs that have never succeeded are always included.
+    async def missed_jobs(self, now=None):
+        now = now or datetime.now(SGT)
+        last_successes = await run_db(load_last_job_successes)
+        missed = []
+        for name, job in self.jobs.items():
+            last_success = last_successes.get(name)
+            if last_success is None:
+                missed.append(name)
+            elif job.cron:
+                scheduled = previous_run(job.cron, now)
+                if scheduled is not None and last_success < scheduled:
+                    missed.append(name)
+        return missed
+
+
+    async def _record(self, job, trigger, status, started_at, duration_s=None, rows=None, error=None):
+        try:
+            await run_db(record_job_run, job, trigger, status, started_at, duration_s, rows, error)
+        except Exception as e:
+            logger.error(f"Failed to record run of {job}: {e}", extra={"category": ["scheduler", "record"]})
+
+
+    # Runs one job now. Returns its status; kwargs are passed through to the job.
+    async def run(self, name, trigger="manual", **kwargs):
+        job = self.jobs[name]
+        started_at = datetime.now(SGT)
+        if job.lock.locked():
+            logger.info(f"Job {name} is already running, skipping {trigger} trigger.", extra={"category": ["scheduler", name]})
+            await self._record(name, trigger, STATUS_SKIPPED, started_at, error="Already running")
+            return STATUS_SKIPPED
+
+        async with job.lock:
+            logger.info(f"Starting job {name} ({trigger}).", extra={"category": ["scheduler", name]})
+            start = time.perf_counter()
+            try:
+                rows = await job.func(**kwargs)
+            except Exception as e:
+                duration = time.perf_counter() - start
+                logger.error(f"Job {name} failed after {duration:.1f}s: %s\n%s", e, traceback.format_exc(), extra={"category": ["scheduler", name]})
+                await self._record(name, trigger, STATUS_FAILED, started_at, duration, error=repr(e))
+                return STATUS_FAILED
+
+            duration = time.perf_counter() - start
+            rows = rows if isinstance(rows, int) and not isinstance(rows, bool) else None
+            logger.info(f"Job {name} finished in {duration:.1f}s ({rows if rows is not None else '-'} rows).", extra={"category": ["scheduler", name]})
+            await self._record(name, trigger, STATUS_SUCCESS, started_at, duration, rows)
+            return STATUS_SUCCESS
+
+
+    # Runs a set of jobs along the dependency graph. A job whose dependency failed is skipped;
+    # a dependency that was already running elsewhere is waited for before its dependents start.
+    async def run_group(self, names, trigger):
+        names = list(names)
+        tasks = {}
+
+        async def run_after_dependencies(name):
+            job = self.jobs[name]
+            for dependency in job.depends_on:
+                if dependency in tasks:
+                    status = await tasks[dependency]
+                    if status == STATUS_FAILED:
+                        logger.warning(f"Skipping job {name}: dependency {dependency} failed.", extra={"category": ["scheduler", name]})
+                        await self._record(name, trigger, STATUS_SKIPPED, datetime.now(SGT), error=f"Dependency {dependency} failed")
+                        return STATUS_SKIPPED
+                # Wait out a run of the dependency started by another trigger
+                async with self.jobs[dependency].lock:
+                    pass
+            return await self.run(name, trigger)
+
+        for name in names:
+            tasks[name] = asyncio.ensure_future(run_after_dependencies(name))
+        statuses = await asyncio.gather(*tasks.values())
+        return dict(zip(names, statuses))
+
+
+    async def _loop(self):
+        while True:
+            now = datetime.now(SGT)
+            wake = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+            await asyncio.sleep((wake - now).total_seconds())
+
+            due = [name for name, job in self.jobs.items() if job.cron and cron_matches(job.cron, wake)]
+            if due:
+                # Not awaited, so a long run never delays the next minute's check
+                asyncio.ensure_future(self.run_group(due, trigger=f"cron {wake:%Y-%m-%d %H:%M}"))
+
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._loop())
+            logger.info(f"Scheduler started with jobs: {', '.join(self.jobs)}", extra={"category": ["scheduler", "start"]})
+
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
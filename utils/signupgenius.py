@@ -0,0 +1,125 @@
+import os
+import re
+from datetime import datetime
+
+
+# "bulk" reads a whole sign-up page in a couple of JavaScript round trips;
+# "xpath" is the original element-by-element WebDriver extraction.
+SCRAPE_EXTRACTION_MODE = os.getenv("SCRAPE_EXTRACTION_MODE", "bulk")
+BULK_SCRIPT_TIMEOUT = 30
+
+# Container prefixes: the slot table sits under div[3] or div[4] depending on the sign-up layout
+SLOT_TABLE_PREFIXES = [
+    '//*[@id="signupcontainer"]/div[3]/div/div[3]/div/table/tbody/tr/td[4]/ng-include/table/tbody',
+    '//*[@id="signupcontainer"]/div[3]/div/div[4]/div/table/tbody/tr/td[4]/ng-include/table/tbody',
+]
+
+_JS_HELPERS = '''
+const node = (path) => document.evaluate(path, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const first = (paths) => { for (const p of paths) { const n = node(p); if (n) return n; } return null; };
+const visible = (n) => n ? n.innerText.trim() : null;
+'''
+
+# Session header (date & room) in one round trip
+HEADER_JS = _JS_HELPERS + '''
+return {
+    date: visible(node('//*[@id="signupcontainer"]/div[1]/div[2]/div[2]/div[2]/div/div[2]')),
+    room: visible(node('//*[@id="signupcontainer"]/div[1]/div[2]/div[2]/div[4]/div/div[2]/span'))
+};
+'''
+
+# All time slots and participants in one async round trip. When the sign-up has a
+# "see all" details modal, it is opened and expanded in-page and its table read instead.
+SLOTS_JS = _JS_HELPERS + '''
+const done = arguments[arguments.length - 1];
+const prefixes = arguments[0];
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+const waitFor = async (path, timeout) => {
+    for (let waited = 0; waited < timeout; waited += 100) {
+        const n = node(path);
+        if (n) return n;
+        await sleep(100);
+    }
+    return null;
+};
+
+(async () => {
+    const slots = [];
+    for (let i = 1; ; i++) {
+        const slot = first(prefixes.map((p) => `${p}/tr[${i}]/td/div/div[1]/div[2]/div[1]/div[1]/div[1]/span`));
+        if (!slot) break;
+        const participants = [];
+        for (let x = 1; ; x++) {
+            const name = first(prefixes.map((p) => `${p}/tr[${i}]/td/div/div[2]/div/participant-summary/div/div[${x}]/div/p/span`));
+            if (!name) break;
+            const admin = first(prefixes.map((p) => `${p}/tr[${i}]/td/div/div[2]/div/participant-summary/div/div[${x}]/div/div/span[3]/span[1]`));
+            participants.push({name: visible(name), admin_num: admin ? admin.textContent : ""});
+        }
+        slots.push({time_slot: visible(slot), participants: participants});
+    }
+
+    let details = null;
+    const detailsLink = node(`${prefixes[0]}/tr/td/div/div[2]/div/participant-summary/div/div[11]/a`);
+    if (detailsLink) {
+        detailsLink.scrollIntoView({block: 'center'});
+        await sleep(500);
+        detailsLink.click();
+        const show50 = await waitFor('/html/body/div[13]/div/div/div/div/div[2]/div[5]/div/items-per-page/ul/li[4]', 10000);
+        if (show50) {
+            show50.click();
+            await waitFor('/html/body/div[13]/div/div/div/div/div[2]/div[4]/div/table/tbody/tr[1]/td[1]', 10000);
+            await sleep(500);
+        }
+        details = [];
+        for (let x = 1; ; x++) {
+            const row = `/html/body/div[13]/div/div/div/div/div[2]/div[4]/div/table/tbody/tr[${x}]`;
+            const firstName = node(`${row}/td[1]`);
+            const lastName = node(`${row}/td[2]`);
+            if (!firstName || !lastName) break;
+            const admin = node(`${row}/td[4]/span[1]`);
+            details.push({name: visible(firstName) + ' ' + visible(lastName), admin_num: admin ? visible(admin) : ""});
+        }
+    }
+    done({slots: slots, details: details});
+})().catch((e) => done({error: String(e)}));
+'''
+
+
+def clean_time_slot(time_slot):
+    time_slot = re.sub(r"(\d{2})(\d{2})", r"\1 \2", time_slot)
+    return re.sub(r"\s*-\s*", " - ", time_slot)
+
+
+def parse_session_date(text):
+    text = re.sub(r"\s*\([^)]*\)", "", text).strip()  # Remove day
+    return datetime.strptime(text, "%m/%d/%Y").date()
+
+
+def extract_header(driver):
+    header = driver.execute_script(HEADER_JS)
+    if not header or not header.get("date") or not header.get("room"):
+        return None
+    return parse_session_date(header["date"]), header["room"]
+
+
+# Returns bookings for every slot on the page, parsed locally from a single payload
+def extract_bookings(driver, date, room):
+    driver.set_script_timeout(BULK_SCRIPT_TIMEOUT)
+    payload = driver.execute_async_script(SLOTS_JS, SLOT_TABLE_PREFIXES)
+    if payload.get("error"):
+        raise RuntimeError(f"Bulk extraction failed: {payload['error']}")
+
+    bookings = []
+    for slot in payload["slots"]:
+        time_slot = clean_time_slot(slot["time_slot"])
+        # As in the XPath extraction, the details modal (when present) replaces the summary list
+        participants = payload["details"] if payload["details"] is not None else slot["participants"]
+        for participant in participants:
+            bookings.append({
+                "date": date,
+                "room": room,
+                "time_slot": time_slot,
+                "name": participant["name"],
+                "admin_num": participant["admin_num"]
+            })
+    return bookings
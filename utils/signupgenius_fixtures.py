@@ -0,0 +1,238 @@
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+from utils.signupgenius import SLOT_TABLE_PREFIXES, clean_time_slot, parse_session_date
+
+
+# Recorded SignUpGenius pages for offline parsing & throughput tests, without Chrome.
+#
+# With SIGNUPGENIUS_RECORD_DIR set, every page the Selenium scraper reads is saved there as the
+# rendered page (<urlid>.html) next to what Selenium extracted from it (<urlid>.json). Sign-ups are
+# rendered client-side, so the rendered page is what a browserless parser has to match.
+#
+#   python -m utils.signupgenius_fixtures check <fixtures_dir>
+#   python -m utils.signupgenius_fixtures serve <fixtures_dir> [--port 8765]
+#   python -m utils.signupgenius_fixtures bench <fixtures_dir> [--base-url http://127.0.0.1:8765]
+SIGNUPGENIUS_RECORD_DIR = os.getenv("SIGNUPGENIUS_RECORD_DIR")
+
+DATE_XPATH = '//*[@id="signupcontainer"]/div[1]/div[2]/div[2]/div[2]/div/div[2]'
+ROOM_XPATH = '//*[@id="signupcontainer"]/div[1]/div[2]/div[2]/div[4]/div/div[2]/span'
+DETAILS_ROW_XPATH = '/html/body/div[13]/div/div/div/div/div[2]/div[4]/div/table/tbody/tr'
+ADMIN_NUM_PATTERN = re.compile(r'\b\d{6}[A-Za-z]\b')
+
+logger = logging.getLogger("pe_helper")
+
+
+# SignUpGenius links look like https://www.signupgenius.com/go/<urlid>[#/ or ?...]
+def urlid_from_link(link):
+    match = re.search(r"/go/([^/#?]+)", urlparse(link).path)
+    return match.group(1) if match else None
+
+
+def record_page(link, html, result):
+    urlid = urlid_from_link(link)
+    if urlid is None:
+        return
+    try:
+        os.makedirs(SIGNUPGENIUS_RECORD_DIR, exist_ok=True)
+        with open(os.path.join(SIGNUPGENIUS_RECORD_DIR, f"{urlid}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+        with open(os.path.join(SIGNUPGENIUS_RECORD_DIR, f"{urlid}.json"), "w", encoding="utf-8") as f:
+            json.dump(result, f, default=str)
+    except OSError as e:
+        logger.warning(f"Failed to record page for {link}: {e}", extra={"category": ["signupgenius_fixtures", "record_page"]})
+
+
+def _text(nodes):
+    return " ".join(nodes[0].text_content().split()) if nodes else None
+
+
+def _first(tree, paths):
+    for path in paths:
+        nodes = tree.xpath(path)
+        if nodes:
+            return nodes
+    return []
+
+
+# Browserless counterpart of extract_header & extract_bookings, reading the same XPaths from a
+# rendered page. Returns (date, room, bookings), or None when the page lacks the header or its
+# participants are only listed in a details modal that was never opened.
+def parse_page_html(html):
+    from lxml import html as lxml_html
+
+    tree = lxml_html.fromstring(html)
+    date_text, room = _text(tree.xpath(DATE_XPATH)), _text(tree.xpath(ROOM_XPATH))
+    if not date_text or not room:
+        return None
+    session_date = parse_session_date(date_text)
+
+    details = None
+    if tree.xpath(f"{SLOT_TABLE_PREFIXES[0]}/tr/td/div/div[2]/div/participant-summary/div/div[11]/a"):
+        rows = tree.xpath(DETAILS_ROW_XPATH)
+        if not rows:
+            return None
+        details = []
+        for row in rows:
+            first_name, last_name = row.xpath("td[1]"), row.xpath("td[2]")
+            if not first_name or not last_name:
+                break
+            details.append({"name": f"{_text(first_name)} {_text(last_name)}", "admin_num": _text(row.xpath("td[4]/span[1]")) or ""})
+
+    bookings = []
+    for i in range(1, 1000):
+        slot = _first(tree, [f"{p}/tr[{i}]/td/div/div[1]/div[2]/div[1]/div[1]/div[1]/span" for p in SLOT_TABLE_PREFIXES])
+        if not slot:
+            break
+        participants = []
+        for x in range(1, 1000):
+            summary = f"tr[{i}]/td/div/div[2]/div/participant-summary/div/div[{x}]"
+            name = _first(tree, [f"{p}/{summary}/div/p/span" for p in SLOT_TABLE_PREFIXES])
+            if not name:
+                break
+            admin = _first(tree, [f"{p}/{summary}/div/div/span[3]/span[1]" for p in SLOT_TABLE_PREFIXES])
+            participants.append({"name": _text(name), "admin_num": admin[0].text_content() if admin else ""})
+
+        time_slot = clean_time_slot(_text(slot))
+        for participant in details if details is not None else participants:
+            bookings.append({"date": session_date, "room": room, "time_slot": time_slot, **participant})
+    return session_date, room, bookings
+
+
+def _booking_key(booking):
+    admin = ADMIN_NUM_PATTERN.search(booking["admin_num"] or "")
+    return booking["time_slot"], " ".join(booking["name"].split()), admin.group(0).upper() if admin else None
+
+
+def _fixtures(fixtures_dir):
+    for filename in sorted(os.listdir(fixtures_dir)):
+        if filename.endswith(".html"):
+            yield filename[:-len(".html")]
+
+
+# Compares the browserless parser with what Selenium extracted from each recorded page
+def check(fixtures_dir):
+    from lxml import etree
+
+    mismatches = 0
+    checked = 0
+    for urlid in _fixtures(fixtures_dir):
+        with open(os.path.join(fixtures_dir, f"{urlid}.html"), "r", encoding="utf-8") as f:
+            html = f.read()
+        with open(os.path.join(fixtures_dir, f"{urlid}.json"), "r", encoding="utf-8") as f:
+            expected = json.load(f)
+        if expected.get("status") != "scraped":
+            continue
+
+        checked += 1
+        try:
+            parsed = parse_page_html(html)
+        except (etree.ParserError, ValueError) as e:
+            parsed, error = None, repr(e)
+        else:
+            error = "page not parseable without a browser"
+        if parsed is None:
+            mismatches += 1
+            print(f"{urlid}: {error}")
+            continue
+
+        session_date, room, bookings = parsed
+        problems = []
+        if str(session_date) != expected["date"]:
+            problems.append(f"date {session_date} != {expected['date']}")
+        if room != " ".join(expected["room"].split()):
+            problems.append(f"room {room!r} != {expected['room']!r}")
+        if sorted(map(_booking_key, bookings)) != sorted(map(_booking_key, expected["bookings"])):
+            problems.append(f"{len(bookings)} bookings differ from Selenium's {len(expected['bookings'])}")
+        if problems:
+            mismatches += 1
+            print(f"{urlid}: {'; '.join(problems)}")
+
+    print(f"{checked - mismatches}/{checked} recorded pages match the Selenium results")
+    return mismatches == 0
+
+
+def make_handler(fixtures_dir):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            urlid = urlid_from_link(self.path)
+            path = os.path.join(fixtures_dir, f"{urlid}.html") if urlid else None
+            if path is None or not os.path.exists(path):
+                self.send_error(404, "No recorded page")
+                return
+
+            with open(path, "rb") as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+
+def serve(fixtures_dir, port):
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(fixtures_dir))
+    print(f"Replaying pages from {fixtures_dir} on http://127.0.0.1:{port}/go/<urlid>")
+    server.serve_forever()
+
+
+# Fetches every recorded page from the fixture server and parses it without a browser
+def bench(fixtures_dir, base_url, concurrency):
+    import httpx
+
+    urlids = list(_fixtures(fixtures_dir))
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            async def fetch_and_parse(urlid):
+                async with semaphore:
+                    response = await client.get(f"/go/{urlid}")
+                response.raise_for_status()
+                return parse_page_html(response.text)
+            return await asyncio.gather(*(fetch_and_parse(urlid) for urlid in urlids))
+
+    started = time.perf_counter()
+    results = asyncio.run(run())
+    elapsed = time.perf_counter() - started
+
+    parsed = [r for r in results if r is not None]
+    bookings = sum(len(r[2]) for r in parsed)
+    print(f"{len(parsed)}/{len(urlids)} pages parsed, {bookings} bookings in {elapsed:.2f}s ({len(urlids) / elapsed:.1f} pages/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SignUpGenius recorded pages: parity check, replay server & offline benchmark")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    check_parser = subparsers.add_parser("check")
+    check_parser.add_argument("fixtures_dir")
+
+    serve_parser = subparsers.add_parser("serve")
+    serve_parser.add_argument("fixtures_dir")
+    serve_parser.add_argument("--port", type=int, default=8765)
+
+    bench_parser = subparsers.add_parser("bench")
+    bench_parser.add_argument("fixtures_dir")
+    bench_parser.add_argument("--base-url", default="http://127.0.0.1:8765")
+    bench_parser.add_argument("--concurrency", type=int, default=4)
+
+    args = parser.parse_args()
+    if args.command == "check":
+        sys.exit(0 if check(args.fixtures_dir) else 1)
+    elif args.command == "serve":
+        serve(args.fixtures_dir, args.port)
+    else:
+        bench(args.fixtures_dir, args.base_url, args.concurrency)
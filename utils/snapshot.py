@@ -0,0 +1,87 @@
+import os
+import json
+import shutil
+import logging
+import threading
+from datetime import datetime
+from utils.variables import SGT
+from utils.database import load_booking_rollups, load_piano_groups, load_summary_numbers
+
+
+# Each data refresh is published as a versioned snapshot directory of Parquet files, written under a
+# temporary name and renamed into place, then announced by atomically replacing manifest.json.
+# Readers poll only the manifest and load a whole version at once, so they never see a partial refresh.
+SNAPSHOT_DIR = "../data/snapshots"
+MANIFEST_FILE = os.path.join(SNAPSHOT_DIR, "manifest.json")
+SNAPSHOT_KEEP = 3  # Older versions stay briefly for readers still loading them
+
+DATASETS = {
+    "booking_rollups": load_booking_rollups,
+    "piano_groups": load_piano_groups,
+    "summary_numbers": load_summary_numbers,
+}
+
+logger = logging.getLogger("pe_helper")
+
+_publish_lock = threading.Lock()
+
+
+def read_manifest(path=MANIFEST_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def snapshot_path(manifest, name, snapshot_dir=SNAPSHOT_DIR):
+    return os.path.join(snapshot_dir, manifest["files"][name])
+
+
+def _write_manifest(manifest):
+    tmp_path = f"{MANIFEST_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, MANIFEST_FILE)
+
+
+def _prune(current_version):
+    for entry in os.listdir(SNAPSHOT_DIR):
+        path = os.path.join(SNAPSHOT_DIR, entry)
+        if not os.path.isdir(path):
+            continue
+        if entry.startswith("."):
+            shutil.rmtree(path, ignore_errors=True)  # Left over from an interrupted publish
+        elif entry.startswith("v") and entry[1:].isdigit() and int(entry[1:]) <= current_version - SNAPSHOT_KEEP:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+# Snapshots every dataset from the database and makes it the current version. Returns rows written.
+def publish_snapshot(conn):
+    with _publish_lock:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        previous = read_manifest()
+        version = previous["version"] + 1 if previous else 1
+
+        tmp_dir = os.path.join(SNAPSHOT_DIR, f".v{version}.tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        files, rows = {}, {}
+        for name, loader in DATASETS.items():
+            df = loader(conn)
+            df.to_parquet(os.path.join(tmp_dir, f"{name}.parquet"), index=False)
+            files[name] = f"v{version}/{name}.parquet"
+            rows[name] = len(df)
+
+        os.rename(tmp_dir, os.path.join(SNAPSHOT_DIR, f"v{version}"))
+        _write_manifest({
+            "version": version,
+            "published_at": datetime.now(SGT).isoformat(),
+            "files": files,
+            "rows": rows,
+        })
+        _prune(version)
+
+    logger.info(f"Published data snapshot v{version} ({sum(rows.values())} rows).", extra={"category": ["snapshot", "publish_snapshot"]})
+    return sum(rows.values())